@@ -15,7 +15,7 @@ class UserAdmin(BaseUserAdmin):
         (None, {"fields": ("email", "password", "phone", "username")}),
         ("Personal info", {"fields": ("first_name", "last_name")}),
         ("Permissions", {"fields": ("is_staff", "is_active", "is_superuser", "groups", "user_permissions")}),
-        ("Important dates", {"fields": ("last_login",)}),
+        ("Important dates", {"fields": ("last_login", "tokens_valid_after")}),
     )
 
     add_fieldsets = (
@@ -26,7 +26,7 @@ class UserAdmin(BaseUserAdmin):
     )
 
     search_fields = ("email",)
-    readonly_fields = ("last_login", "username")
+    readonly_fields = ("last_login", "username", "tokens_valid_after")
 
     filter_horizontal = ("groups", "user_permissions")
 
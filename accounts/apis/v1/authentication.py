@@ -0,0 +1,147 @@
+"""
+JWT authentication that loads the request principal in one query.
+
+The user is fetched together with its customer and period profile, so
+IsCustomer, request.user.customer and customer.period_profile never hit
+the database again. The principal is loaded fresh on every request, so
+handlers that save it never write back stale rows.
+
+ClaimsJWTAuth is an opt-in mode for read endpoints that only need the
+user and customer ids. Those travel as signed claims (see issue_tokens),
+so the only per-request lookup is the revocation state of the user, kept
+in the default cache for TOKEN_STATE_TIMEOUT seconds. Saving the user
+drops that entry only in the cache the saving process sees: with a cache
+shared by all workers (Redis, Memcached, the file backend on one host) a
+revocation applies at once, with the default per-process LocMemCache
+other workers keep accepting revoked tokens for up to
+TOKEN_STATE_TIMEOUT seconds.
+"""
+from django.core.cache import cache
+from django.utils.translation import gettext_lazy as _
+from ninja_jwt.authentication import AsyncJWTAuth, JWTAuth
+from ninja_jwt.exceptions import AuthenticationFailed, InvalidToken
+from ninja_jwt.models import TokenUser
+from ninja_jwt.settings import api_settings
+from ninja_jwt.tokens import RefreshToken
+
+from accounts.models import User, is_token_revoked
+
+PRINCIPAL_RELATED = ('customer', 'customer__period_profile')
+
+CUSTOMER_ID_CLAIM = 'customer_id'
+IS_ACTIVE_CLAIM = 'is_active'
+TOKEN_STATE_KEY = "auth:token-state:{user_id}"
+# Upper bound on how long a revocation can go unseen by other workers
+# when the cache is not shared between them
+TOKEN_STATE_TIMEOUT = 60
+
+
+def load_principal(user_id):
+    """The user with customer and period profile, in a single query"""
+    return User.objects.select_related(*PRINCIPAL_RELATED).filter(
+        **{api_settings.USER_ID_FIELD: user_id}).first()
+
+
+def issue_tokens(user):
+    """
+    RefreshToken for the user carrying the claims ClaimsJWTAuth reads.
+    Access tokens derived from it copy the claims.
+    """
+    refresh = RefreshToken.for_user(user)
+    customer = getattr(user, 'customer', None)
+    refresh[CUSTOMER_ID_CLAIM] = str(customer.pk) if customer else None
+    refresh[IS_ACTIVE_CLAIM] = user.is_active
+    return refresh
+
+
+def _get_user_id(validated_token):
+    try:
+        return validated_token[api_settings.USER_ID_CLAIM]
+    except KeyError as e:
+        raise InvalidToken(
+            _("Token contained no recognizable user identification")
+        ) from e
+
+
+class PrincipalJWTAuth(JWTAuth):
+    """
+    JWTAuth loading the user with select_related in a single query.
+    AsyncJWTAuth calls get_user through sync_to_async, so the async
+    variant below shares this code.
+    """
+
+    def get_user(self, validated_token):
+        user = load_principal(_get_user_id(validated_token))
+        if user is None:
+            raise AuthenticationFailed(_("User not found"))
+        if not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"))
+        if user.tokens_revoked(validated_token):
+            raise AuthenticationFailed(_("Token has been revoked"))
+        return user
+
+
+class AsyncPrincipalJWTAuth(PrincipalJWTAuth, AsyncJWTAuth):
+    pass
+
+
+class ClaimsUser(TokenUser):
+    """Stateless user backed by the claims of a validated token"""
+
+    @property
+    def customer_id(self):
+        return self.token.get(CUSTOMER_ID_CLAIM)
+
+
+def get_token_state(user_id):
+    """
+    (is_active, tokens_valid_after) of the user, (False, None) when the
+    user no longer exists. Read through the cache; saving the user drops
+    the entry, which other workers only see if the cache is shared.
+    """
+    key = TOKEN_STATE_KEY.format(user_id=user_id)
+    state = cache.get(key)
+    if state is None:
+        row = User.objects.filter(
+            **{api_settings.USER_ID_FIELD: user_id}
+        ).values_list('is_active', 'tokens_valid_after').first()
+        # Missing users are cached too, as a revoked state
+        state = row or (False, None)
+        cache.set(key, state, TOKEN_STATE_TIMEOUT)
+    return state
+
+
+def invalidate_token_state(user_id):
+    cache.delete(TOKEN_STATE_KEY.format(user_id=user_id))
+
+
+class ClaimsJWTAuth(PrincipalJWTAuth):
+    """
+    Opt-in auth for read endpoints: request.user is a ClaimsUser built
+    from the token, with id and customer_id, and no user query is run.
+    Handlers must only use those ids. Tokens issued before the claims
+    existed fall back to the principal lookup, with customer_id set on
+    the loaded user.
+    """
+
+    def get_user(self, validated_token):
+        if CUSTOMER_ID_CLAIM not in validated_token:
+            user = super().get_user(validated_token)
+            customer = getattr(user, 'customer', None)
+            user.customer_id = customer.pk if customer else None
+            return user
+
+        user_id = _get_user_id(validated_token)
+        if not validated_token.get(IS_ACTIVE_CLAIM, False):
+            raise AuthenticationFailed(_("User is inactive"))
+
+        is_active, valid_after = get_token_state(user_id)
+        if not is_active:
+            raise AuthenticationFailed(_("User is inactive"))
+        if is_token_revoked(validated_token, valid_after):
+            raise AuthenticationFailed(_("Token has been revoked"))
+        return ClaimsUser(validated_token)
+
+
+class AsyncClaimsJWTAuth(ClaimsJWTAuth, AsyncJWTAuth):
+    pass
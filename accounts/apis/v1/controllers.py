@@ -1,5 +1,6 @@
 from django.conf import settings
 from django.contrib.auth import authenticate
+from django.core.exceptions import ValidationError
 from ninja.errors import HttpError
 from ninja_extra import api_controller, http_post
 from ninja_jwt.tokens import RefreshToken
@@ -7,6 +8,7 @@ from ninja.responses import Response
 from core.exceptions import ApiError
 from starlette import status
 
+from accounts.apis.v1.authentication import issue_tokens
 from accounts.models import User, UserOtp
 from core.helpers import decrypt_small
 
@@ -53,7 +55,7 @@ class AuthAPIController:
             raise HttpError(401, "User account is disabled")
 
         # Generate tokens
-        refresh = RefreshToken.for_user(user)
+        refresh = issue_tokens(user)
 
         user_data = {
             "id": user.id,
@@ -96,31 +98,11 @@ class AuthAPIController:
         except User.DoesNotExist:
             raise HttpError(400, "User with this ID does not exist")
 
-        # Get the active OTP for this user
+        # Verify and consume the active OTP for this user
         try:
-            user_otp = UserOtp.objects.get(
-                email=user.email,
-                is_active=True
-            )
-        except UserOtp.DoesNotExist:
-            raise HttpError(400, "No active OTP found for this user")
-
-        # Verify the OTP
-        if user_otp.otp != payload.otp:
-            user_otp.failed_attempts += 1
-            user_otp.save()
-
-            if user_otp.failed_attempts >= 3:
-                user_otp.is_active = False
-                user_otp.save()
-                raise HttpError(
-                    400, "Maximum OTP verification attempts exceeded")
-
-            raise HttpError(400, "Invalid OTP")
-
-        # OTP is valid, mark it as inactive
-        user_otp.is_active = False
-        user_otp.save()
+            UserOtp.verify_email_otp(user.email, payload.otp)
+        except ValidationError as e:
+            raise HttpError(400, e.messages[0])
 
         if is_login:
             # Ensure user is active for login
@@ -132,7 +114,7 @@ class AuthAPIController:
             user.save()
 
         # Generate tokens
-        refresh = RefreshToken.for_user(user)
+        refresh = issue_tokens(user)
 
         user_data = {
             "id": user.id,
@@ -169,22 +151,24 @@ class AuthAPIController:
         try:
             # Validate the old refresh token
             refresh = RefreshToken(payload.refresh)
+        except Exception:
+            raise HttpError(401, "Invalid or expired refresh token")
 
-            if settings.NINJA_JWT.get('ROTATE_REFRESH_TOKENS', False):
-                # Create a completely new refresh token for rotation
-                # Get the user from the token
-                user_id = refresh.get('user_id')
-                user = User.objects.get(id=user_id)
-                refresh = RefreshToken.for_user(user)
-            return {
-                "access": str(refresh.access_token),
-                "refresh": str(refresh),
-            }
-        except User.DoesNotExist:
+        user = User.objects.filter(id=refresh.get('user_id')).first()
+        if user is None:
             raise HttpError(401, "User not found")
-        except Exception:
+        if not user.is_active or user.tokens_revoked(refresh):
             raise HttpError(401, "Invalid or expired refresh token")
 
+        if settings.NINJA_JWT.get('ROTATE_REFRESH_TOKENS', False):
+            # Create a completely new refresh token for rotation, with
+            # up to date claims
+            refresh = issue_tokens(user)
+        return {
+            "access": str(refresh.access_token),
+            "refresh": str(refresh),
+        }
+
     @http_post(
         'verify-token/',
         response={200: VerifyTokenResponseSchema, },
@@ -1,12 +1,39 @@
-from ninja_extra.permissions import BasePermission
+from ninja_extra.permissions import AsyncBasePermission, BasePermission
+
+from accounts.models import User
+from customers.models import Customer
 
 
 class IsCustomer(BasePermission):
     """
-    Allows access only to users with a customer profile
+    Allows access only to users with a customer profile, or with a
+    customer_id claim under ClaimsJWTAuth
     """
 
     def has_permission(self, request, controller):
         user = request.user
         return bool(
-            user and user.is_authenticated and hasattr(user, "customer"))
+            user and user.is_authenticated and (
+                getattr(user, "customer_id", None)
+                or hasattr(user, "customer")))
+
+
+class AsyncIsCustomer(AsyncBasePermission):
+    """
+    Async IsCustomer. The customer normally comes preloaded with the
+    principal; otherwise it is loaded once with the async ORM and cached on
+    the user, so handlers can read request.user.customer without touching
+    the database from the event loop.
+    """
+
+    async def has_permission_async(self, request, controller):
+        user = request.user
+        if not (user and user.is_authenticated):
+            return False
+        if User.customer.is_cached(user):
+            return hasattr(user, "customer")
+        customer = await Customer.objects.filter(user=user).afirst()
+        if customer is None:
+            return False
+        user.customer = customer
+        return True
@@ -1,14 +1,27 @@
+import math
+from datetime import timedelta
+
 from django.conf import settings
 from django.contrib.auth.models import AbstractUser
-from django.db import models
+from django.db import models, transaction
+from django.db.models import F, Q
 from django.core.exceptions import ValidationError
 from django.contrib.auth import get_user_model
+from django.utils.crypto import constant_time_compare
+from django.utils.timezone import now
 from django.utils.translation import gettext_lazy as _
 from phonenumber_field.modelfields import PhoneNumberField
 
 from core.helpers import generate_otp
 
 
+def is_token_revoked(token, valid_after):
+    # iat is in whole seconds, so a token issued in the same second as the
+    # revocation is still accepted
+    return valid_after is not None and (
+        token.get('iat', 0) < int(valid_after.timestamp()))
+
+
 class CustomUser(AbstractUser):
     phone = PhoneNumberField(max_length=17, blank=True, null=True)
     email = models.EmailField(
@@ -18,6 +31,8 @@ class CustomUser(AbstractUser):
             'unique': _("A user with that email already exists."),
         },
     )
+    # Tokens issued before this moment are rejected
+    tokens_valid_after = models.DateTimeField(null=True, blank=True)
 
     def clean(self, *args, **kwargs):
 
@@ -37,6 +52,19 @@ class CustomUser(AbstractUser):
 
         return super().save(*args, **kwargs)
 
+    def set_password(self, raw_password):
+        super().set_password(raw_password)
+        self.tokens_valid_after = now()
+
+    def revoke_tokens(self):
+        """Invalidate every access and refresh token issued so far"""
+        self.tokens_valid_after = now()
+        self.save(update_fields=['tokens_valid_after'])
+
+    def tokens_revoked(self, token):
+        """Whether the validated token was issued before a revocation"""
+        return is_token_revoked(token, self.tokens_valid_after)
+
     @property
     def get_display_name(self):
         return self.get_full_name() or self.email
@@ -61,6 +89,14 @@ class UserOtp(models.Model):
     phone_number = PhoneNumberField(blank=True)
     email = models.EmailField(blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    last_sent_at = models.DateTimeField(null=True, blank=True)
+    expires_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['email', 'is_active']),
+            models.Index(fields=['expires_at']),
+        ]
 
     def __str__(self):
         return str(self.phone_number)
@@ -69,32 +105,81 @@ class UserOtp(models.Model):
         # TODO: Send OTP via email
         pass
 
-    @classmethod
-    def create_email_otp(cls, email, length=6):
-        otp = generate_otp(length)
+    def get_expires_at(self):
+        # Rows from before expires_at existed expire relative to creation
+        return self.expires_at or self.created_at + timedelta(
+            minutes=settings.OTP_CONFIG["OTP_EXPIRY_MINUTES"])
+
+    def is_expired(self, at=None):
+        return (at or now()) >= self.get_expires_at()
 
-        user_otp, created = cls.objects.update_or_create(
+    @classmethod
+    def _check_lockout(cls, email, at):
+        """Reject new OTPs for a while after one was locked by failures"""
+        config = settings.OTP_CONFIG
+        locked = cls.objects.filter(
             email=email,
-            is_active=True,
-            defaults={
-                "otp": otp,
-                "attempts": 1,
-            },
-        )
+            is_active=False,
+            failed_attempts__gte=config["MAX_FAILED_OTP_ATTEMPTS"],
+            last_sent_at__gte=at - timedelta(
+                minutes=config["FAILED_RETRY_OTP_INTERVAL_MINUTES"]),
+        ).exists()
+        if locked:
+            raise ValidationError(
+                "Too many failed OTP attempts. Please try again later.")
 
-        # Existing active OTP
-        if not created:
-            if user_otp.attempts >= settings.OTP_CONFIG["MAX_OTP_ATTEMPTS"]:
-                raise ValidationError(
-                    "Maximum OTP attempts exceeded. Please try again later."
+    @classmethod
+    def create_email_otp(cls, email, length=None):
+        """
+        Send a new OTP to the email, reusing the active row if there is
+        one. Enforces the resend interval, the number of sends per OTP and
+        the retry interval after a lockout.
+        """
+        config = settings.OTP_CONFIG
+        otp = generate_otp(length or config["OTP_LENGTH"])
+        current = now()
+        expires_at = current + timedelta(
+            minutes=config["OTP_EXPIRY_MINUTES"])
+
+        with transaction.atomic():
+            user_otp = cls.objects.select_for_update().filter(
+                email=email, is_active=True).order_by('-created_at').first()
+
+            if user_otp is None or user_otp.is_expired(current):
+                cls._check_lockout(email, current)
+                user_otp = cls.objects.create(
+                    email=email,
+                    is_active=True,
+                    otp=otp,
+                    attempts=1,
+                    last_sent_at=current,
+                    expires_at=expires_at,
                 )
+            else:
+                resend_at = (user_otp.last_sent_at or user_otp.created_at) + (
+                    timedelta(seconds=config["RESEND_OTP_INTERVAL_SECONDS"]))
+                if current < resend_at:
+                    wait = math.ceil((resend_at - current).total_seconds())
+                    raise ValidationError(
+                        f"Please wait {wait} seconds before requesting "
+                        f"a new OTP."
+                    )
+                if user_otp.attempts >= config["MAX_OTP_ATTEMPTS"]:
+                    raise ValidationError(
+                        "Maximum OTP attempts exceeded. Please try again later."
+                    )
+
+                cls.objects.filter(pk=user_otp.pk).update(
+                    otp=otp,
+                    attempts=F('attempts') + 1,
+                    last_sent_at=current,
+                    expires_at=expires_at,
+                )
+                user_otp.refresh_from_db()
 
-            user_otp.attempts += 1
-            user_otp.save(update_fields=["attempts"])
-
-        # Deactivate other OTPs
-        cls.objects.filter(email=email).exclude(id=user_otp.id).update(
-            is_active=False)
+            # Deactivate other OTPs
+            cls.objects.filter(email=email, is_active=True).exclude(
+                id=user_otp.id).update(is_active=False)
 
         user_otp.send_otp_email()
 
@@ -102,3 +187,61 @@ class UserOtp(models.Model):
             print(f"Email OTP for {email}: {otp}")
 
         return user_otp
+
+    @classmethod
+    def verify_email_otp(cls, email, otp):
+        """
+        Check the OTP against the active one of the email and consume it.
+        Failed attempts are counted atomically; the OTP is deactivated once
+        they reach MAX_FAILED_OTP_ATTEMPTS.
+        """
+        user_otp = cls.objects.filter(
+            email=email, is_active=True).order_by('-created_at').first()
+        if user_otp is None:
+            raise ValidationError("No active OTP found for this user")
+
+        if user_otp.is_expired():
+            cls.objects.filter(pk=user_otp.pk).update(is_active=False)
+            raise ValidationError("OTP has expired")
+
+        if not constant_time_compare(user_otp.otp, otp):
+            cls.objects.filter(pk=user_otp.pk).update(
+                failed_attempts=F('failed_attempts') + 1)
+            locked = cls.objects.filter(
+                pk=user_otp.pk,
+                failed_attempts__gte=settings.OTP_CONFIG[
+                    "MAX_FAILED_OTP_ATTEMPTS"],
+            ).update(is_active=False)
+            if locked:
+                raise ValidationError(
+                    "Maximum OTP verification attempts exceeded")
+            raise ValidationError("Invalid OTP")
+
+        # Only one concurrent request can consume the OTP
+        if not cls.objects.filter(
+                pk=user_otp.pk, is_active=True).update(is_active=False):
+            raise ValidationError("No active OTP found for this user")
+        return user_otp
+
+    @classmethod
+    def sweep(cls, batch_size=1000, at=None):
+        """
+        Delete expired OTPs in batches, keeping them for the lockout
+        window first. Returns the number of rows deleted.
+        """
+        config = settings.OTP_CONFIG
+        at = at or now()
+        cutoff = at - timedelta(
+            minutes=config["FAILED_RETRY_OTP_INTERVAL_MINUTES"])
+        dead = cls.objects.filter(
+            Q(expires_at__lt=cutoff)
+            | Q(expires_at__isnull=True, created_at__lt=cutoff - timedelta(
+                minutes=config["OTP_EXPIRY_MINUTES"]))
+        )
+
+        deleted = 0
+        while True:
+            ids = list(dead.values_list('id', flat=True)[:batch_size])
+            if not ids:
+                return deleted
+            deleted += cls.objects.filter(id__in=ids).delete()[0]
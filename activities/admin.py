@@ -1,7 +1,7 @@
 from django.contrib import admin
 from activities.models import (
     HydrationLog, HydrationContent, Medication, MedicationLog,
-    NutritionLog, NutritionGoal, FoodSuggestion
+    NutritionLog, NutritionDailyTotal, NutritionGoal, FoodSuggestion
 )
 
 # Register your models here.
@@ -51,6 +51,15 @@ class NutritionLogAdmin(admin.ModelAdmin):
     ordering = ('-date', '-created_at')
 
 
+@admin.register(NutritionDailyTotal)
+class NutritionDailyTotalAdmin(admin.ModelAdmin):
+    list_display = ('customer', 'date', 'calories', 'carbs', 'protein', 'fat', 'log_count', 'updated_at')
+    list_filter = ('date',)
+    search_fields = ('customer__user__email', 'customer__user__phone')
+    ordering = ('-date',)
+    readonly_fields = ('calories', 'carbs', 'protein', 'fat', 'log_count')
+
+
 @admin.register(NutritionGoal)
 class NutritionGoalAdmin(admin.ModelAdmin):
     list_display = ('customer', 'calories', 'carbs', 'protein', 'fat', 'created_at', 'updated_at')
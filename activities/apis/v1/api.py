@@ -1,5 +1,13 @@
+from .async_controllers import (
+    AsyncHydrationAPIController, AsyncMedicationAPIController,
+    AsyncNutritionAPIController)
 from .controllers import (
-    ActivitiesAPIController, HydrationAPIController, MedicationAPIController, NutritionAPIController)
+    ActivitiesAPIController, HydrationAPIController, MedicationAPIController, NutritionAPIController,
+    SyncAPIController)
 
 register_controllers = [
-    ActivitiesAPIController, HydrationAPIController, MedicationAPIController, NutritionAPIController]
+    ActivitiesAPIController, HydrationAPIController, MedicationAPIController, NutritionAPIController,
+    SyncAPIController]
+register_async_controllers = [
+    AsyncHydrationAPIController, AsyncMedicationAPIController,
+    AsyncNutritionAPIController]
@@ -0,0 +1,79 @@
+from ninja_extra import api_controller, http_get
+from typing import List
+
+from activities.apis.v1.schemas import (
+    HydrationLogOutputSchema, MedicationWithDosesOutputSchema,
+    ErrorResponseSchema, NutritionSummarySchema)
+from accounts.apis.v1.permissions import AsyncIsCustomer
+from activities.models import (
+    HydrationLog, NutritionDailyTotal, NutritionLog, NutritionGoal)
+from activities.services import (
+    MedicationService, NutritionService, summarize_nutrition)
+
+
+@api_controller("hydration/", tags=["Hydration"])
+class AsyncHydrationAPIController:
+
+    @http_get(
+        'hydration/{date}',
+        response={200: HydrationLogOutputSchema, 404: dict}
+    )
+    async def get_hydration_log(self, request, date: str):
+        """Get hydration log for a specific date"""
+        user = request.user
+
+        try:
+            hydration_log = await HydrationLog.objects.aget(
+                user=user, date=date
+            )
+            return 200, hydration_log
+        except HydrationLog.DoesNotExist:
+            return 404, {"detail": "No hydration log found for this date"}
+
+
+@api_controller("medication/", tags=["Medication"])
+class AsyncMedicationAPIController:
+    """Async read endpoints for medications"""
+
+    @http_get(
+        'medications/by-date/{date}',
+        response=List[MedicationWithDosesOutputSchema]
+    )
+    async def get_medications_with_doses(self, request, date: str):
+        """Get all medications with their dose status for a specific date"""
+        return await MedicationService.aget_medications_with_doses(
+            user=request.user,
+            target_date=date
+        )
+
+
+@api_controller(
+    "nutrition/", tags=["Nutrition"], permissions=[AsyncIsCustomer])
+class AsyncNutritionAPIController:
+    """Async read endpoints for nutrition tracking"""
+
+    @http_get(
+        'summary/{date}',
+        response={200: NutritionSummarySchema, 400: ErrorResponseSchema}
+    )
+    async def get_nutrition_summary(self, request, date: str):
+        """Get nutrition summary for a specific date"""
+        customer = request.user.customer
+
+        goal, _ = await NutritionGoal.objects.aget_or_create(
+            customer=customer)
+
+        logs = NutritionLog.objects.filter(customer=customer, date=date)
+        totals = await NutritionDailyTotal.objects.filter(
+            customer=customer, date=date
+        ).values(*NutritionService.NUTRIENTS).afirst()
+        totals, progress = summarize_nutrition(
+            totals or dict.fromkeys(NutritionService.NUTRIENTS, 0), goal)
+
+        return 200, {
+            'date': date,
+            'logs': [log async for log in logs],
+            'goal': goal,
+            'totals': totals,
+            'progress': progress
+        }
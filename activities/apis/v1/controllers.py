@@ -1,8 +1,8 @@
 from ninja_extra import (
-    api_controller, http_get, http_post, http_put, http_delete
+    api_controller, http_get, http_post, http_put, http_delete, paginate
 )
-from typing import List
-from django.db.models import Q, Sum
+from datetime import date
+from typing import List, Optional
 
 from activities.constants import (
     MOODS, RATING_SECTIONS, SYMPTOMS, ACTIVITIES,
@@ -10,20 +10,33 @@ from activities.constants import (
 from activities.apis.v1.schemas import (
     DailyEntryInputSchema, DailyEntryOutputSchema,
     HydrationLogInputSchema, HydrationLogOutputSchema,
-    HydrationContentOutputSchema,
+    HydrationContentOutputSchema, HydrationRangeSchema,
     MedicationInputSchema, MedicationOutputSchema,
-    MedicationWithDosesOutputSchema, MedicationLogInputSchema,
+    MedicationWithDosesOutputSchema, MedicationDoseDaySchema,
+    MedicationLogInputSchema,
     MedicationLogOutputSchema, MedicationStatsSchema,
+    MedicationAdherenceSchema,
+    MedicationLogBatchInputSchema, MedicationLogBatchOutputSchema,
     ErrorResponseSchema,
     NutritionLogInputSchema, NutritionLogOutputSchema,
     NutritionGoalInputSchema, NutritionGoalOutputSchema,
-    FoodSuggestionOutputSchema, NutritionSummarySchema,
-    FoodSearchResultSchema)
+    FoodSuggestionOutputSchema, NutritionSummarySchema, NutritionRangeSchema,
+    FoodSearchResultSchema,
+    SyncPullOutputSchema, SyncPushInputSchema, SyncPushOutputSchema)
+from accounts.apis.v1.authentication import ClaimsJWTAuth
+from accounts.apis.v1.permissions import IsCustomer
 from core.models import DailyEntry
+from core.pagination import CursorPaginatedResponseSchema, KeysetPagination
 from activities.models import (
     HydrationLog, HydrationContent,
-    NutritionLog, NutritionGoal, FoodSuggestion)
-from activities.services import MedicationService
+    NutritionLog, NutritionGoal)
+from activities import food_search
+from activities.services import (
+    HydrationService, MedicationService, NutritionService,
+    summarize_nutrition)
+from activities.sync import (
+    MAX_SYNC_PAGE_SIZE, SYNC_PAGE_SIZE, SyncError, pull_changes,
+    push_mutations)
 
 
 @api_controller("activities/", tags=["Daily Actions"])
@@ -216,6 +229,8 @@ class ActivitiesAPIController:
 @api_controller("hydration/", tags=["Hydration"])
 class HydrationAPIController:
 
+    MAX_RANGE_DAYS = 366
+
     # Hydration Endpoints
     @http_get(
         'hydration/{date}',
@@ -233,6 +248,30 @@ class HydrationAPIController:
         except HydrationLog.DoesNotExist:
             return 404, {"detail": "No hydration log found for this date"}
 
+    @http_get(
+        'range/',
+        response={200: HydrationRangeSchema, 400: ErrorResponseSchema}
+    )
+    def get_hydration_range(self, request, start: date, end: date):
+        """Get logged hydration over a date range with goal streaks"""
+        if end < start:
+            return 400, {
+                "error": "Invalid date range",
+                "detail": "end must be on or after start"
+            }
+
+        if (end - start).days >= self.MAX_RANGE_DAYS:
+            return 400, {
+                "error": "Invalid date range",
+                "detail": (
+                    f"Date range can not exceed {self.MAX_RANGE_DAYS} days"
+                )
+            }
+
+        data = HydrationService.get_range(request.user, start, end)
+        data['streak'] = HydrationService.get_streaks(request.user)
+        return 200, data
+
     @http_post('hydration/', response=HydrationLogOutputSchema)
     def create_or_update_hydration_log(
             self, request, payload: HydrationLogInputSchema):
@@ -287,6 +326,9 @@ class MedicationAPIController:
     # Error messages
     MEDICATION_NOT_FOUND = "Medication not found"
 
+    MAX_DOSE_GRID_DAYS = 31
+    MAX_ADHERENCE_DAYS = 366
+
     def __init__(self):
         self.service = MedicationService()
 
@@ -302,6 +344,38 @@ class MedicationAPIController:
         )
         return medications_with_doses
 
+    @http_get(
+        'medications/by-range/',
+        response={
+            200: List[MedicationDoseDaySchema],
+            400: ErrorResponseSchema
+        }
+    )
+    def get_medication_dose_grid(
+        self, request, start_date: date, end_date: date
+    ):
+        """Get all medications with their dose status for a date range"""
+        if end_date < start_date:
+            return 400, {
+                "error": "Invalid date range",
+                "detail": "end_date must be on or after start_date"
+            }
+
+        if (end_date - start_date).days >= self.MAX_DOSE_GRID_DAYS:
+            return 400, {
+                "error": "Invalid date range",
+                "detail": (
+                    f"Date range can not exceed "
+                    f"{self.MAX_DOSE_GRID_DAYS} days"
+                )
+            }
+
+        return 200, self.service.get_medication_dose_grid(
+            user=request.user,
+            start_date=start_date,
+            end_date=end_date
+        )
+
     @http_post(
         'medications/',
         response={201: MedicationOutputSchema, 400: ErrorResponseSchema}
@@ -412,6 +486,25 @@ class MedicationAPIController:
                 "detail": str(e)
             }
 
+    @http_post(
+        'medication-log/batch/',
+        response={200: MedicationLogBatchOutputSchema}
+    )
+    def batch_toggle_medication_doses(
+        self, request, payload: MedicationLogBatchInputSchema
+    ):
+        """Toggle many medication doses as taken/not taken at once"""
+        results = self.service.bulk_toggle_medication_doses(
+            user=request.user,
+            items=[item.dict() for item in payload.logs]
+        )
+        updated = sum(1 for result in results if result['success'])
+        return 200, {
+            'results': results,
+            'updated': updated,
+            'failed': len(results) - updated,
+        }
+
     @http_get('medication-stats/{date}', response=MedicationStatsSchema)
     def get_medication_stats(self, request, date: str):
         """Get medication completion statistics for a specific date"""
@@ -422,10 +515,42 @@ class MedicationAPIController:
         return stats
 
 
+    @http_get(
+        'adherence/',
+        response={200: MedicationAdherenceSchema, 400: ErrorResponseSchema}
+    )
+    def get_medication_adherence(
+        self, request, start_date: date, end_date: date
+    ):
+        """Get expected versus taken doses over a date range"""
+        if end_date < start_date:
+            return 400, {
+                "error": "Invalid date range",
+                "detail": "end_date must be on or after start_date"
+            }
+
+        if (end_date - start_date).days >= self.MAX_ADHERENCE_DAYS:
+            return 400, {
+                "error": "Invalid date range",
+                "detail": (
+                    f"Date range can not exceed "
+                    f"{self.MAX_ADHERENCE_DAYS} days"
+                )
+            }
+
+        return 200, self.service.get_adherence(
+            user=request.user,
+            start_date=start_date,
+            end_date=end_date
+        )
+
+
 @api_controller("nutrition/", tags=["Nutrition"])
 class NutritionAPIController:
     """Controller for nutrition tracking endpoints"""
 
+    MAX_RANGE_DAYS = 366
+
     @http_get(
         'summary/{date}',
         response={200: NutritionSummarySchema, 400: ErrorResponseSchema}
@@ -440,29 +565,9 @@ class NutritionAPIController:
         # Get all logs for the date
         logs = NutritionLog.objects.filter(customer=customer, date=date)
 
-        # Calculate totals
-        totals = logs.aggregate(
-            calories=Sum('calories'),
-            carbs=Sum('carbs'),
-            protein=Sum('protein'),
-            fat=Sum('fat')
-        )
-
-        # Handle None values from empty aggregation
-        totals = {
-            'calories': totals['calories'] or 0,
-            'carbs': totals['carbs'] or 0,
-            'protein': totals['protein'] or 0,
-            'fat': totals['fat'] or 0,
-        }
-
-        # Calculate progress
-        progress = {
-            'calories': min(100, round((totals['calories'] / goal.calories) * 100, 2)) if goal.calories > 0 and totals['calories'] else 0,
-            'carbs': min(100, round((totals['carbs'] / goal.carbs) * 100, 2)) if goal.carbs > 0 and totals['carbs'] else 0,
-            'protein': min(100, round((totals['protein'] / goal.protein) * 100, 2)) if goal.protein > 0 and totals['protein'] else 0,
-            'fat': min(100, round((totals['fat'] / goal.fat) * 100, 2)) if goal.fat > 0 and totals['fat'] else 0,
-        }
+        # Totals come from the daily rollup
+        totals = NutritionService.get_daily_totals(customer, date)
+        totals, progress = summarize_nutrition(totals, goal)
 
         return 200, {
             'date': date,
@@ -472,6 +577,45 @@ class NutritionAPIController:
             'progress': progress
         }
 
+    @http_get(
+        'range/',
+        response={200: NutritionRangeSchema, 400: ErrorResponseSchema}
+    )
+    def get_nutrition_range(
+        self, request, start_date: date, end_date: date
+    ):
+        """Get daily nutrition totals and goal progress over a date range"""
+        if end_date < start_date:
+            return 400, {
+                "error": "Invalid date range",
+                "detail": "end_date must be on or after start_date"
+            }
+
+        if (end_date - start_date).days >= self.MAX_RANGE_DAYS:
+            return 400, {
+                "error": "Invalid date range",
+                "detail": (
+                    f"Date range can not exceed {self.MAX_RANGE_DAYS} days"
+                )
+            }
+
+        return 200, NutritionService.get_range(
+            customer=request.user.customer,
+            start_date=start_date,
+            end_date=end_date
+        )
+
+    @http_get(
+        'logs/',
+        response=CursorPaginatedResponseSchema[NutritionLogOutputSchema],
+        auth=ClaimsJWTAuth(),
+    )
+    @paginate(KeysetPagination, ordering=('-date', '-id'))
+    def get_nutrition_logs(self, request):
+        """Get nutrition logs, newest first"""
+        return NutritionLog.objects.filter(
+            customer_id=request.user.customer_id)
+
     @http_post(
         'logs/',
         response={201: NutritionLogOutputSchema, 400: ErrorResponseSchema}
@@ -544,32 +688,22 @@ class NutritionAPIController:
         self, request,
         q: str = '',
         page: int = 1,
-        page_size: int = 10
+        page_size: int = 10,
+        with_total: bool = False
     ):
-        """Search food suggestions with pagination"""
+        """
+        Search food suggestions with pagination. Matches are only counted
+        when with_total is set, autocomplete should rely on has_next.
+        """
         if page < 1:
             return 400, {"error": "Invalid page number", "detail": "Page must be >= 1"}
 
         if page_size < 1 or page_size > 100:
             return 400, {"error": "Invalid page size", "detail": "Page size must be between 1 and 100"}
 
-        # Build query
-        queryset = FoodSuggestion.objects.filter(is_active=True)
-
-        if q:
-            queryset = queryset.filter(
-                Q(name__icontains=q)
-            )
-
-        # Get total count
-        total = queryset.count()
-
-        # Paginate
-        start = (page - 1) * page_size
-        end = start + page_size
-        results = list(queryset[start:end])
-
-        has_next = end < total
+        results, has_next, total = food_search.search_food_suggestions(
+            q, offset=(page - 1) * page_size, limit=page_size,
+            with_total=with_total)
 
         return 200, {
             'results': results,
@@ -578,3 +712,39 @@ class NutritionAPIController:
             'page_size': page_size,
             'has_next': has_next
         }
+
+
+@api_controller("sync/", tags=["Sync"], permissions=[IsCustomer])
+class SyncAPIController:
+    """Controller for offline-first delta sync of daily tracking data"""
+
+    @http_get(
+        '',
+        response={200: SyncPullOutputSchema, 400: ErrorResponseSchema}
+    )
+    def get_changes(
+        self, request,
+        cursor: Optional[str] = None,
+        page_size: int = SYNC_PAGE_SIZE
+    ):
+        """Get all tracking rows changed since the cursor"""
+        if page_size < 1 or page_size > MAX_SYNC_PAGE_SIZE:
+            return 400, {
+                "error": "Invalid page size",
+                "detail": (
+                    f"Page size must be between 1 and {MAX_SYNC_PAGE_SIZE}")
+            }
+
+        try:
+            return 200, pull_changes(request.user, cursor, page_size)
+        except SyncError as e:
+            return 400, {"error": "Invalid cursor", "detail": str(e)}
+
+    @http_post('', response={200: SyncPushOutputSchema})
+    def apply_mutations(self, request, payload: SyncPushInputSchema):
+        """Apply a batch of offline client changes"""
+        results = push_mutations(
+            request.user,
+            [mutation.dict() for mutation in payload.mutations]
+        )
+        return 200, {'results': results}
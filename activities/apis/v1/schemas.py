@@ -1,6 +1,6 @@
 from datetime import datetime, date
 from ninja import Schema, ModelSchema, Field
-from typing import List, Dict, Optional
+from typing import Any, List, Dict, Literal, Optional
 from pydantic import validator
 from activities.models import Medication, MedicationLog
 
@@ -46,6 +46,21 @@ class HydrationLogOutputSchema(Schema):
     updated_at: datetime
 
 
+class HydrationStreakSchema(Schema):
+    current_streak: int
+    longest_streak: int
+
+
+class HydrationRangeSchema(Schema):
+    start_date: date
+    end_date: date
+    dates: List[date]
+    amount_ml: List[int]
+    goal_ml: List[int]
+    progress: List[float]
+    streak: HydrationStreakSchema
+
+
 # Hydration Content Schemas
 class HydrationContentItemSchema(Schema):
     id: int
@@ -118,6 +133,11 @@ class MedicationWithDosesOutputSchema(Schema):
     doses: List[DoseScheduleSchema]
 
 
+class MedicationDoseDaySchema(Schema):
+    date: date
+    medications: List[MedicationWithDosesOutputSchema]
+
+
 class MedicationLogInputSchema(Schema):
     medication_id: int = Field(..., gt=0)
     date: date
@@ -125,6 +145,26 @@ class MedicationLogInputSchema(Schema):
     taken: bool
 
 
+class MedicationLogBatchInputSchema(Schema):
+    logs: List[MedicationLogInputSchema] = Field(
+        ..., min_length=1, max_length=500)
+
+
+class MedicationLogBatchItemSchema(Schema):
+    medication_id: int
+    date: date
+    dose_index: int
+    taken: bool
+    success: bool
+    error: Optional[str] = None
+
+
+class MedicationLogBatchOutputSchema(Schema):
+    results: List[MedicationLogBatchItemSchema]
+    updated: int
+    failed: int
+
+
 class MedicationLogOutputSchema(ModelSchema):
     medication_id: int
 
@@ -142,6 +182,33 @@ class MedicationStatsSchema(Schema):
     completion_percent: float = Field(..., ge=0, le=100)
 
 
+class MedicationAdherenceItemSchema(Schema):
+    id: int
+    name: str
+    color: str
+    frequency_period: str
+    expected_doses: float
+    taken_doses: int
+    adherence_percent: float
+
+
+class AdherenceDailySeriesSchema(Schema):
+    dates: List[date]
+    expected: List[float]
+    taken: List[int]
+    adherence_percent: List[float]
+
+
+class MedicationAdherenceSchema(Schema):
+    start_date: date
+    end_date: date
+    expected_doses: float
+    taken_doses: int
+    adherence_percent: float
+    medications: List[MedicationAdherenceItemSchema]
+    daily: AdherenceDailySeriesSchema
+
+
 class ErrorResponseSchema(Schema):
     """Standard error response schema"""
     error: str
@@ -206,9 +273,68 @@ class NutritionSummarySchema(Schema):
     progress: Dict
 
 
+class NutritionProgressSeriesSchema(Schema):
+    calories: List[float]
+    carbs: List[float]
+    protein: List[float]
+    fat: List[float]
+
+
+class NutritionRangeSchema(Schema):
+    start_date: date
+    end_date: date
+    goal: NutritionGoalOutputSchema
+    dates: List[date]
+    calories: List[int]
+    carbs: List[float]
+    protein: List[float]
+    fat: List[float]
+    progress: NutritionProgressSeriesSchema
+
+
 class FoodSearchResultSchema(Schema):
     results: List[FoodSuggestionOutputSchema]
-    total: int
+    total: Optional[int] = None
     page: int
     page_size: int
     has_next: bool
+
+
+# Sync Schemas
+class SyncDeletedSchema(Schema):
+    model: str
+    id: str
+    changed_at: datetime
+
+
+class SyncPullOutputSchema(Schema):
+    changes: Dict[str, List[Dict[str, Any]]]
+    deleted: List[SyncDeletedSchema]
+    next_cursor: Optional[str] = None
+    has_more: bool
+
+
+class SyncMutationSchema(Schema):
+    model: str
+    op: Literal['upsert', 'delete']
+    id: Optional[str] = None
+    data: Dict[str, Any] = {}
+    client_updated_at: datetime
+
+
+class SyncPushInputSchema(Schema):
+    mutations: List[SyncMutationSchema] = Field(
+        ..., min_length=1, max_length=200)
+
+
+class SyncMutationResultSchema(Schema):
+    model: str
+    op: str
+    id: Optional[str] = None
+    status: str  # 'applied', 'conflict' or 'error'
+    error: Optional[str] = None
+    row: Optional[Dict[str, Any]] = None
+
+
+class SyncPushOutputSchema(Schema):
+    results: List[SyncMutationResultSchema]
@@ -0,0 +1,154 @@
+"""
+Autocomplete search over FoodSuggestion.
+
+On PostgreSQL matches come from the pg_trgm GIN index on the name (see
+FoodSuggestion.Meta.indexes), ranked by word similarity and usage_count.
+Word similarity finds nothing for terms shorter than
+TRIGRAM_MIN_QUERY_LENGTH, those fall back to a substring match. has_next
+comes from fetching one row past the page; the matches are only counted
+when the caller asks for the total. Other
+backends (SQLite in dev) use an in-process prefix trie over the words of
+the active suggestions, rebuilt every FOOD_TRIE_TTL seconds and whenever a
+suggestion changes in this process.
+"""
+import re
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from django.contrib.postgres.search import TrigramWordSimilarity
+from django.db import connections
+
+from activities.models import FoodSuggestion
+
+FOOD_TRIE_TTL = 5 * 60
+SEARCH_FIELDS = ('id', 'name', 'calories', 'carbs', 'protein', 'fat')
+TRIGRAM_MIN_QUERY_LENGTH = 3
+
+_WORD_RE = re.compile(r"\w+")
+
+
+def _words(text: str) -> List[str]:
+    return _WORD_RE.findall(text.lower())
+
+
+class FoodTrie:
+    """
+    Prefix trie over the distinct words of the suggestion names. Every
+    node holds the indexes of the items with a word starting with its
+    prefix, already in ranking order, so a lookup is O(len(prefix)) plus
+    the page size.
+    """
+
+    def __init__(self, items: List[Dict]):
+        # items must be in ranking order
+        self.items = items
+        self.words = [set(_words(item['name'])) for item in items]
+        self.root = {'children': {}, 'items': []}
+
+        for index, words in enumerate(self.words):
+            for word in words:
+                node = self.root
+                for char in word:
+                    node = node['children'].setdefault(
+                        char, {'children': {}, 'items': []})
+                    # Two words of one name can share a prefix
+                    if not node['items'] or node['items'][-1] != index:
+                        node['items'].append(index)
+
+    def _find(self, prefix: str) -> List[int]:
+        node = self.root
+        for char in prefix:
+            node = node['children'].get(char)
+            if node is None:
+                return []
+        return node['items']
+
+    def search(
+        self, query: str, offset: int, limit: int
+    ) -> Tuple[List[Dict], bool, int]:
+        """Return (page of items, has_next, total matches)"""
+        tokens = _words(query)
+        if not tokens:
+            matches = range(len(self.items))
+        else:
+            candidates = min(
+                (self._find(token) for token in tokens), key=len)
+            if len(tokens) == 1:
+                matches = candidates
+            else:
+                matches = [
+                    index for index in candidates
+                    if all(
+                        any(word.startswith(token)
+                            for word in self.words[index])
+                        for token in tokens)
+                ]
+
+        page = [self.items[index] for index in matches[offset:offset + limit]]
+        return page, len(matches) > offset + limit, len(matches)
+
+
+_trie = {"trie": None, "expires_at": 0}
+_trie_lock = threading.Lock()
+
+
+def get_food_trie() -> FoodTrie:
+    now = time.monotonic()
+    trie = _trie["trie"]
+    if trie is not None and now < _trie["expires_at"]:
+        return trie
+
+    with _trie_lock:
+        if _trie["trie"] is not None and now < _trie["expires_at"]:
+            return _trie["trie"]
+        items = list(
+            FoodSuggestion.objects.filter(is_active=True)
+            .order_by('-usage_count', 'name')
+            .values(*SEARCH_FIELDS)
+        )
+        _trie["trie"] = FoodTrie(items)
+        _trie["expires_at"] = now + FOOD_TRIE_TTL
+        return _trie["trie"]
+
+
+def invalidate_food_trie():
+    _trie["trie"] = None
+    _trie["expires_at"] = 0
+
+
+def _search_postgres(
+    query: str, offset: int, limit: int, with_total: bool
+) -> Tuple[List[Dict], bool, Optional[int]]:
+    queryset = FoodSuggestion.objects.filter(is_active=True)
+    if len(query) >= TRIGRAM_MIN_QUERY_LENGTH:
+        # `%>` is served by the trigram index
+        queryset = queryset.filter(
+            name__trigram_word_similar=query
+        ).annotate(
+            rank=TrigramWordSimilarity(query, 'name')
+        ).order_by('-rank', '-usage_count', 'name')
+    else:
+        if query:
+            queryset = queryset.filter(name__icontains=query)
+        queryset = queryset.order_by('-usage_count', 'name')
+
+    rows = list(queryset.values(*SEARCH_FIELDS)[offset:offset + limit + 1])
+    total = queryset.count() if with_total else None
+    return rows[:limit], len(rows) > limit, total
+
+
+def search_food_suggestions(
+    query: str, offset: int = 0, limit: int = 10, with_total: bool = False
+) -> Tuple[List[Dict], bool, Optional[int]]:
+    """
+    Search active food suggestions by name.
+
+    Returns (results, has_next, total). total is None unless with_total
+    is set, except on the trie which knows it for free.
+    """
+    query = query.strip()
+    connection = connections[FoodSuggestion.objects.db]
+    if connection.vendor == 'postgresql':
+        return _search_postgres(query, offset, limit, with_total)
+    return get_food_trie().search(query, offset, limit)
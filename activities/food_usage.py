@@ -0,0 +1,64 @@
+"""
+Deferred usage_count updates for FoodSuggestion.
+
+Saving a new or renamed NutritionLog, from the API or through sync, only
+marks it usage_pending (see NutritionLog.save and activities.signals),
+so popular foods never turn meal inserts into hot-row updates. The
+flush_food_usage management command, run on a schedule (every minute
+from cron is plenty), folds the pending logs into usage_count with one
+UPDATE ... CASE statement per batch. The pending flag lives in the
+database, so nothing is lost when a worker is recycled or killed.
+"""
+from collections import Counter
+from typing import Dict
+
+from django.db import transaction
+from django.db.models import Case, F, IntegerField, Value, When
+
+from activities.models import FoodSuggestion, NutritionLog
+
+FOOD_USAGE_BATCH_SIZE = 1000
+
+
+def apply_usage_counts(counts: Dict[str, int], increment: bool = True) -> int:
+    """
+    Write usage counts keyed by suggestion name in a single UPDATE.
+    Adds to the stored counts, or replaces them when increment is False.
+    Returns the number of suggestions updated.
+    """
+    if not counts:
+        return 0
+
+    value = Case(
+        *(When(name=name, then=Value(count)) for name, count in counts.items()),
+        output_field=IntegerField(),
+    )
+    return FoodSuggestion.objects.filter(name__in=counts).update(
+        usage_count=F('usage_count') + value if increment else value)
+
+
+def flush_food_usage(batch_size: int = FOOD_USAGE_BATCH_SIZE) -> int:
+    """
+    Count the pending nutrition logs into FoodSuggestion.usage_count and
+    clear their flag. Rows locked by a concurrent flush are skipped, so
+    overlapping runs never count a log twice. Names without a suggestion
+    are dropped. Returns the number of logs counted.
+    """
+    flushed = 0
+    while True:
+        with transaction.atomic():
+            rows = list(
+                NutritionLog.objects.select_for_update(skip_locked=True)
+                .filter(usage_pending=True)
+                .order_by('id')
+                .values_list('id', 'name')[:batch_size])
+            if not rows:
+                return flushed
+
+            counts = Counter(
+                name.strip() for _, name in rows if name.strip())
+            apply_usage_counts(counts)
+            NutritionLog.objects.filter(
+                id__in=[log_id for log_id, _ in rows]
+            ).update(usage_pending=False)
+        flushed += len(rows)
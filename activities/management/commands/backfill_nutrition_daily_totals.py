@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand
+
+from activities.models import NutritionLog
+from activities.services import NutritionService
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the NutritionDailyTotal rollups from nutrition logs'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Customers rebuilt per transaction (default: 500)',
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        customer_ids = NutritionLog.objects.values_list(
+            'customer_id', flat=True).distinct().order_by('customer_id')
+
+        customers = 0
+        rollups = 0
+        batch = []
+        for customer_id in customer_ids.iterator(chunk_size=batch_size):
+            batch.append(customer_id)
+            if len(batch) >= batch_size:
+                rollups += NutritionService.rebuild_daily_totals(batch)
+                customers += len(batch)
+                self.stdout.write(f'{customers} customers processed')
+                batch = []
+
+        if batch:
+            rollups += NutritionService.rebuild_daily_totals(batch)
+            customers += len(batch)
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Rebuilt {rollups} daily totals for {customers} customers'))
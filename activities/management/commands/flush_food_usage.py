@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from activities.food_usage import FOOD_USAGE_BATCH_SIZE, flush_food_usage
+
+
+class Command(BaseCommand):
+    help = (
+        'Count pending nutrition logs into FoodSuggestion.usage_count, '
+        'meant to run on a schedule'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=FOOD_USAGE_BATCH_SIZE,
+            help=f'Logs counted per transaction (default: {FOOD_USAGE_BATCH_SIZE})',
+        )
+
+    def handle(self, *args, **options):
+        flushed = flush_food_usage(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Counted {flushed} nutrition logs into food usage'))
@@ -0,0 +1,48 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count
+
+from activities.food_usage import apply_usage_counts
+from activities.models import FoodSuggestion, NutritionLog
+
+
+class Command(BaseCommand):
+    help = 'Rebuild FoodSuggestion.usage_count from nutrition log history'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Suggestions updated per UPDATE statement (default: 1000)',
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        suggestion_names = set(
+            FoodSuggestion.objects.values_list('name', flat=True))
+
+        # Counts are grouped in the database and streamed back in chunks,
+        # so the log table is never loaded into memory
+        counts = NutritionLog.objects.values('name').annotate(
+            uses=Count('id')).order_by()
+
+        updated = 0
+        with transaction.atomic():
+            FoodSuggestion.objects.update(usage_count=0)
+            # Every log is counted below, nothing is left for flush_food_usage
+            NutritionLog.objects.filter(
+                usage_pending=True).update(usage_pending=False)
+
+            batch = {}
+            for row in counts.iterator(chunk_size=batch_size):
+                if row['name'] not in suggestion_names:
+                    continue
+                batch[row['name']] = row['uses']
+                if len(batch) >= batch_size:
+                    updated += apply_usage_counts(batch, increment=False)
+                    batch = {}
+            updated += apply_usage_counts(batch, increment=False)
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Rebuilt usage counts for {updated} food suggestions'))
@@ -1,9 +1,28 @@
+from django.contrib.postgres.indexes import GinIndex
 from django.db import models
 from django.contrib.auth import get_user_model
 
 # Create your models here.
 
 
+class TrigramIndex(GinIndex):
+    """
+    pg_trgm GIN index on PostgreSQL. The extension is enabled right before
+    the index is created, so the locally generated migrations need no
+    extra operation (pg_trgm is a trusted extension, the database owner
+    may create it). Other databases (SQLite in dev) get a plain index on
+    the same fields, their searches are served by the prefix trie in
+    activities.food_search.
+    """
+
+    def create_sql(self, model, schema_editor, using="", **kwargs):
+        if schema_editor.connection.vendor != 'postgresql':
+            return models.Index.create_sql(
+                self, model, schema_editor, using=using, **kwargs)
+        schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        return super().create_sql(model, schema_editor, using=using, **kwargs)
+
+
 class HydrationLog(models.Model):
     """Model to track water intake for users"""
     user = models.ForeignKey(
@@ -23,6 +42,7 @@ class HydrationLog(models.Model):
         ordering = ["-date"]
         indexes = [
             models.Index(fields=['user', 'date']),
+            models.Index(fields=['user', 'updated_at']),
         ]
 
     def __str__(self):
@@ -160,6 +180,7 @@ class MedicationLog(models.Model):
         indexes = [
             models.Index(fields=['medication', 'date']),
             models.Index(fields=['date', 'taken']),
+            models.Index(fields=['updated_at']),
         ]
 
     def __str__(self):
@@ -177,6 +198,9 @@ class NutritionLog(models.Model):
     carbs = models.FloatField(default=0, help_text="Carbohydrates in grams")
     protein = models.FloatField(default=0, help_text="Protein in grams")
     fat = models.FloatField(default=0, help_text="Fat in grams")
+    usage_pending = models.BooleanField(
+        default=False, editable=False,
+        help_text="Not yet counted in FoodSuggestion.usage_count")
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -184,12 +208,49 @@ class NutritionLog(models.Model):
         ordering = ["-date", "-created_at"]
         indexes = [
             models.Index(fields=['customer', 'date']),
+            models.Index(fields=['customer', 'updated_at']),
+            # Only the handful of logs awaiting flush_food_usage
+            models.Index(
+                fields=['id'],
+                condition=models.Q(usage_pending=True),
+                name='nutrition_log_usage_idx',
+            ),
         ]
 
+    def save(self, *args, **kwargs):
+        # Every new log, whichever API created it, is counted into
+        # FoodSuggestion.usage_count by flush_food_usage
+        if self._state.adding:
+            self.usage_pending = True
+        super().save(*args, **kwargs)
+
     def __str__(self):
         return f"{self.customer} - {self.date} - {self.name} ({self.calories} cal)"
 
 
+class NutritionDailyTotal(models.Model):
+    """
+    Per-day rollup of a customer's nutrition logs, kept in step with
+    NutritionLog by activities.signals
+    """
+    customer = models.ForeignKey(
+        'customers.Customer', on_delete=models.CASCADE, related_name='nutrition_daily_totals')
+    date = models.DateField()
+    calories = models.IntegerField(default=0)
+    carbs = models.FloatField(default=0)
+    protein = models.FloatField(default=0)
+    fat = models.FloatField(default=0)
+    log_count = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ("customer", "date")
+        ordering = ["-date"]
+
+    def __str__(self):
+        return f"{self.customer} - {self.date} - {self.calories} cal"
+
+
 class NutritionGoal(models.Model):
     """Model to store customer's daily nutrition goals"""
     customer = models.OneToOneField(
@@ -226,6 +287,12 @@ class FoodSuggestion(models.Model):
         indexes = [
             models.Index(fields=['is_active', '-usage_count']),
             models.Index(fields=['name']),
+            # Serves the `%>` word-similarity search of food_search
+            TrigramIndex(
+                fields=['name'],
+                opclasses=['gin_trgm_ops'],
+                name='food_name_trgm_gin_idx',
+            ),
         ]
 
     def __str__(self):
@@ -1,13 +1,18 @@
 """
 Service layer for activities app business logic
 """
+import calendar
 from typing import List, Dict, Optional, Tuple
-from datetime import date
+from datetime import date, timedelta
 from django.utils import timezone
-from django.db import transaction
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.db.models import Count, F, Prefetch, Q, Sum
 from django.contrib.auth import get_user_model
 
-from activities.models import Medication, MedicationLog
+from activities.models import (
+    HydrationLog, Medication, MedicationLog, NutritionDailyTotal, NutritionGoal,
+    NutritionLog)
 
 
 User = get_user_model()
@@ -51,49 +56,118 @@ class MedicationService:
     @staticmethod
     @transaction.atomic
     def soft_delete_medication(medication: Medication) -> None:
-        """Soft delete a medication by marking it as inactive"""
+        """
+        Soft delete a medication by marking it as inactive. The end date is
+        pulled in to today, so past adherence still counts its active days.
+        """
+        today = timezone.localdate()
         medication.is_active = False
+        if medication.end_date is None or medication.end_date > today:
+            medication.end_date = today
         medication.save()
 
     @staticmethod
+    def _get_medications_with_logs(
+        user: 'User', start_date: date, end_date: date
+    ):
+        """
+        Active medications with their logs for the date range attached as
+        `range_logs`, fetched with one prefetch query
+        """
+        logs = MedicationLog.objects.filter(
+            date__range=(start_date, end_date)
+        ).order_by('date', 'dose_index')
+        return Medication.objects.filter(
+            user=user, is_active=True
+        ).prefetch_related(
+            Prefetch('logs', queryset=logs, to_attr='range_logs')
+        )
+
+    @staticmethod
+    def _build_medication_doses(
+        med: Medication, log_dict: Dict[int, MedicationLog]
+    ) -> Dict:
+        # Build doses array
+        doses = []
+        for idx, time_label in enumerate(med.dose_times):
+            log = log_dict.get(idx)
+            doses.append({
+                'dose_index': idx,
+                'time': time_label,
+                'taken': log.taken if log else False
+            })
+
+        return {
+            'id': med.id,
+            'name': med.name,
+            'dosage': med.dosage,
+            'frequency': med.frequency_text,
+            'color': med.color,
+            'doses': doses
+        }
+
+    @classmethod
     def get_medications_with_doses(
-        user: 'User', target_date: date
+        cls, user: 'User', target_date: date
     ) -> List[Dict]:
         """
         Get all medications with dose status for a specific date
 
         Returns medications with their doses and completion status
         """
-        medications = Medication.objects.filter(user=user, is_active=True)
-        result = []
+        medications = cls._get_medications_with_logs(
+            user, target_date, target_date)
+
+        return [
+            cls._build_medication_doses(
+                med, {log.dose_index: log for log in med.range_logs})
+            for med in medications
+        ]
+
+    @classmethod
+    async def aget_medications_with_doses(
+        cls, user: 'User', target_date: date
+    ) -> List[Dict]:
+        """Async get_medications_with_doses"""
+        medications = cls._get_medications_with_logs(
+            user, target_date, target_date)
 
+        return [
+            cls._build_medication_doses(
+                med, {log.dose_index: log for log in med.range_logs})
+            async for med in medications
+        ]
+
+    @classmethod
+    def get_medication_dose_grid(
+        cls, user: 'User', start_date: date, end_date: date
+    ) -> List[Dict]:
+        """
+        Get medications with dose status for every date in a range
+
+        Runs a constant number of queries regardless of the number of
+        medications or days; logs are grouped in memory per date.
+        """
+        medications = list(
+            cls._get_medications_with_logs(user, start_date, end_date))
+
+        # (medication id, date) -> {dose_index: log}
+        grouped: Dict[Tuple[int, date], Dict[int, MedicationLog]] = {}
         for med in medications:
-            # Get logs for this medication and date
-            logs = MedicationLog.objects.filter(
-                medication=med,
-                date=target_date
-            ).order_by('dose_index')
-
-            # Create a dict for quick lookup
-            log_dict = {log.dose_index: log for log in logs}
-
-            # Build doses array
-            doses = []
-            for idx, time_label in enumerate(med.dose_times):
-                log = log_dict.get(idx)
-                doses.append({
-                    'dose_index': idx,
-                    'time': time_label,
-                    'taken': log.taken if log else False
-                })
+            for log in med.range_logs:
+                grouped.setdefault((med.id, log.date), {})[
+                    log.dose_index] = log
 
+        result = []
+        for offset in range((end_date - start_date).days + 1):
+            day = start_date + timedelta(days=offset)
             result.append({
-                'id': med.id,
-                'name': med.name,
-                'dosage': med.dosage,
-                'frequency': med.frequency_text,
-                'color': med.color,
-                'doses': doses
+                'date': day,
+                'medications': [
+                    cls._build_medication_doses(
+                        med, grouped.get((med.id, day), {}))
+                    for med in medications
+                ]
             })
 
         return result
@@ -143,6 +217,76 @@ class MedicationService:
 
         return log, created
 
+    @staticmethod
+    @transaction.atomic
+    def bulk_toggle_medication_doses(
+        user: 'User', items: List[Dict]
+    ) -> List[Dict]:
+        """
+        Mark many medication doses as taken/not taken in one upsert
+
+        Ownership is validated with a single query; deactivated medications
+        are reported as not found, as in the single-dose path. All valid
+        items are written with one bulk_create on the (medication, date,
+        dose_index) unique key. When the same dose appears more than once
+        the last item wins.
+
+        Returns one result dict per submitted item, in order
+        """
+        medications = Medication.objects.filter(
+            user=user,
+            is_active=True,
+            id__in={item['medication_id'] for item in items}
+        ).in_bulk()
+
+        now = timezone.now()
+        results = []
+        logs = {}
+        for item in items:
+            result = {
+                'medication_id': item['medication_id'],
+                'date': item['date'],
+                'dose_index': item['dose_index'],
+                'taken': item['taken'],
+                'success': False,
+                'error': None,
+            }
+            results.append(result)
+
+            medication = medications.get(item['medication_id'])
+            if not medication:
+                result['error'] = "Medication not found"
+                continue
+
+            dose_times = medication.dose_times
+            if item['dose_index'] >= len(dose_times):
+                result['error'] = (
+                    f"Invalid dose index: {item['dose_index']}. "
+                    f"Maximum allowed: {len(dose_times) - 1}"
+                )
+                continue
+
+            key = (medication.id, item['date'], item['dose_index'])
+            logs[key] = MedicationLog(
+                medication=medication,
+                date=item['date'],
+                dose_index=item['dose_index'],
+                dose_time=dose_times[item['dose_index']],
+                taken=item['taken'],
+                taken_at=now if item['taken'] else None,
+            )
+            result['success'] = True
+
+        if logs:
+            MedicationLog.objects.bulk_create(
+                logs.values(),
+                update_conflicts=True,
+                unique_fields=['medication', 'date', 'dose_index'],
+                update_fields=['dose_time', 'taken', 'taken_at', 'updated_at'],
+            )
+
+        return results
+
     @staticmethod
     def get_medication_stats(
         user: 'User', target_date: date
@@ -152,27 +296,395 @@ class MedicationService:
 
         Returns dict with total/taken doses and completion percent
         """
-        # Get all active medications
-        medications = Medication.objects.filter(user=user, is_active=True)
+        medications = list(MedicationService.get_medications_in_range(
+            user, target_date, target_date))
 
-        # Calculate total expected doses for the day
-        total_doses = sum(med.times_per_period for med in medications)
+        # Expected doses for the day, following each schedule
+        expected = sum(
+            MedicationService.get_expected_doses_per_day(med, target_date)
+            for med in medications)
+        total_doses = round(expected)
 
         # Get all logs for this date that are marked as taken
         taken_doses = MedicationLog.objects.filter(
-            medication__user=user,
-            medication__is_active=True,
+            medication__in=[med.id for med in medications],
             date=target_date,
             taken=True
         ).count()
 
-        # Calculate completion percentage
-        completion_percent = (
-            (taken_doses / total_doses * 100) if total_doses > 0 else 0
-        )
-
         return {
             'total_doses': total_doses,
             'taken_doses': taken_doses,
-            'completion_percent': round(completion_percent, 2)
+            'completion_percent': _adherence_percent(taken_doses, expected)
+        }
+
+    @staticmethod
+    def get_active_range(medication: Medication) -> Tuple[date, Optional[date]]:
+        """
+        First and last day (None if ongoing) the medication was taken.
+        Without a start date it starts on the day it was added. An inactive
+        medication without an end date ends on its last update, which is
+        when it was deactivated unless edited afterwards.
+        """
+        first_day = medication.start_date or timezone.localdate(
+            medication.created_at)
+        last_day = medication.end_date
+        if not medication.is_active and last_day is None:
+            last_day = timezone.localdate(medication.updated_at)
+        return first_day, last_day
+
+    @staticmethod
+    def get_medications_in_range(
+        user: 'User', start_date: date, end_date: date
+    ):
+        """
+        Medications of the user that may have been active on some day of
+        the range, including ones deactivated since
+        """
+        return Medication.objects.filter(
+            Q(start_date__lte=end_date)
+            | Q(start_date__isnull=True, created_at__date__lte=end_date),
+            user=user,
+        ).filter(
+            Q(is_active=True)
+            | Q(end_date__gte=start_date)
+            | Q(end_date__isnull=True, updated_at__date__gte=start_date)
+        )
+
+    @classmethod
+    def get_expected_doses_per_day(
+        cls, medication: Medication, day: date
+    ) -> float:
+        """
+        Expected doses of a medication on a given day, respecting its
+        frequency period and the days it was active. Weekly and monthly
+        doses are spread evenly over the days of the period.
+        """
+        first_day, last_day = cls.get_active_range(medication)
+        if day < first_day or (last_day and day > last_day):
+            return 0
+
+        times = medication.times_per_period
+        period = medication.frequency_period
+        if period == 'daily':
+            return times
+        if period == 'weekly':
+            return times / 7
+        if period == 'monthly':
+            return times / calendar.monthrange(day.year, day.month)[1]
+        if period == 'once':
+            return times if day == first_day else 0
+        return 0
+
+    @classmethod
+    def get_adherence(
+        cls, user: 'User', start_date: date, end_date: date
+    ) -> Dict:
+        """
+        Get expected versus taken doses over a date range
+
+        Runs two queries regardless of the range length: one for the
+        medications and one aggregate of taken doses grouped by medication
+        and date. Returns totals, a per-medication breakdown and per-day
+        series as parallel arrays.
+        """
+        medications = list(
+            cls.get_medications_in_range(user, start_date, end_date))
+
+        taken_counts = MedicationLog.objects.filter(
+            medication__in=[med.id for med in medications],
+            date__range=(start_date, end_date),
+            taken=True
+        ).values('medication_id', 'date').annotate(taken=Count('id'))
+
+        taken_by_day: Dict[Tuple[int, date], int] = {
+            (row['medication_id'], row['date']): row['taken']
+            for row in taken_counts
+        }
+
+        days = [
+            start_date + timedelta(days=offset)
+            for offset in range((end_date - start_date).days + 1)
+        ]
+        daily_expected = [0.0] * len(days)
+        daily_taken = [0] * len(days)
+
+        medication_rows = []
+        for med in medications:
+            expected = 0.0
+            taken = 0
+            for index, day in enumerate(days):
+                day_expected = cls.get_expected_doses_per_day(med, day)
+                day_taken = taken_by_day.get((med.id, day), 0)
+                expected += day_expected
+                taken += day_taken
+                daily_expected[index] += day_expected
+                daily_taken[index] += day_taken
+
+            medication_rows.append({
+                'id': med.id,
+                'name': med.name,
+                'color': med.color,
+                'frequency_period': med.frequency_period,
+                'expected_doses': round(expected, 2),
+                'taken_doses': taken,
+                'adherence_percent': _adherence_percent(taken, expected),
+            })
+
+        expected_total = sum(daily_expected)
+        taken_total = sum(daily_taken)
+
+        return {
+            'start_date': start_date,
+            'end_date': end_date,
+            'expected_doses': round(expected_total, 2),
+            'taken_doses': taken_total,
+            'adherence_percent': _adherence_percent(
+                taken_total, expected_total),
+            'medications': medication_rows,
+            'daily': {
+                'dates': days,
+                'expected': [round(value, 2) for value in daily_expected],
+                'taken': daily_taken,
+                'adherence_percent': [
+                    _adherence_percent(taken, expected)
+                    for taken, expected in zip(daily_taken, daily_expected)
+                ],
+            },
+        }
+
+
+
+class NutritionService:
+    """Service class for the nutrition daily rollups"""
+
+    NUTRIENTS = ('calories', 'carbs', 'protein', 'fat')
+
+    @classmethod
+    def apply_log_delta(
+        cls, customer_id, target_date: date, values: Dict, sign: int
+    ) -> None:
+        """
+        Add (sign=1) or remove (sign=-1) one log's nutrients from the
+        customer's rollup for the date with an F-expression update
+        """
+        changes = {
+            key: F(key) + sign * (values[key] or 0) for key in cls.NUTRIENTS
+        }
+        changes['log_count'] = F('log_count') + sign
+
+        rollup = NutritionDailyTotal.objects.filter(
+            customer_id=customer_id, date=target_date)
+        if rollup.update(**changes) or sign < 0:
+            return
+
+        _, created = NutritionDailyTotal.objects.get_or_create(
+            customer_id=customer_id,
+            date=target_date,
+            defaults={
+                **{key: values[key] or 0 for key in cls.NUTRIENTS},
+                'log_count': 1,
+            }
+        )
+        if not created:
+            # Created concurrently since the update above
+            rollup.update(**changes)
+
+    @classmethod
+    def get_daily_totals(cls, customer, target_date: date) -> Dict:
+        """Totals for one day read from the rollup"""
+        totals = NutritionDailyTotal.objects.filter(
+            customer=customer, date=target_date
+        ).values(*cls.NUTRIENTS).first()
+        return totals or {key: 0 for key in cls.NUTRIENTS}
+
+    @classmethod
+    def get_range(
+        cls, customer, start_date: date, end_date: date
+    ) -> Dict:
+        """
+        Daily totals and goal progress over a date range as parallel
+        arrays, from one indexed query on the rollup. Days without logs
+        are reported as zero.
+        """
+        goal, _ = NutritionGoal.objects.get_or_create(customer=customer)
+
+        rows = {
+            row['date']: row
+            for row in NutritionDailyTotal.objects.filter(
+                customer=customer, date__range=(start_date, end_date)
+            ).values('date', *cls.NUTRIENTS)
+        }
+
+        days = [
+            start_date + timedelta(days=offset)
+            for offset in range((end_date - start_date).days + 1)
+        ]
+        series = {key: [] for key in cls.NUTRIENTS}
+        progress = {key: [] for key in cls.NUTRIENTS}
+        for day in days:
+            totals, day_progress = summarize_nutrition(
+                rows.get(day) or {key: 0 for key in cls.NUTRIENTS}, goal)
+            for key in cls.NUTRIENTS:
+                series[key].append(totals[key])
+                progress[key].append(day_progress[key])
+
+        return {
+            'start_date': start_date,
+            'end_date': end_date,
+            'goal': goal,
+            'dates': days,
+            **series,
+            'progress': progress,
+        }
+
+    @classmethod
+    @transaction.atomic
+    def rebuild_daily_totals(cls, customer_ids: List) -> int:
+        """
+        Recompute the rollups of the given customers from their logs.
+        Returns the number of rollup rows written.
+        """
+        NutritionDailyTotal.objects.filter(
+            customer_id__in=customer_ids).delete()
+
+        totals = NutritionLog.objects.filter(
+            customer_id__in=customer_ids
+        ).values('customer_id', 'date').annotate(
+            log_count=Count('id'),
+            **{key: Sum(key) for key in cls.NUTRIENTS}
+        ).order_by()
+
+        rollups = NutritionDailyTotal.objects.bulk_create(
+            [NutritionDailyTotal(**row) for row in totals],
+            batch_size=1000,
+        )
+        return len(rollups)
+
+
+
+class HydrationService:
+    """Service class for hydration history and streaks"""
+
+    STREAK_CACHE_KEY = "hydration:streak:{user_id}:{today}"
+    STREAK_CACHE_TIMEOUT = 60 * 60 * 24
+
+    # Integer day number of the `date` column per database vendor
+    DAY_NUMBER_SQL = {
+        'postgresql': "(date - DATE '1970-01-01')",
+        'sqlite': "CAST(julianday(date) AS INTEGER)",
+        'mysql': "TO_DAYS(date)",
+    }
+
+    @staticmethod
+    def get_range(user: 'User', start_date: date, end_date: date) -> Dict:
+        """
+        Logged days in a date range as parallel arrays, from one query on
+        the (user, date) index
+        """
+        logs = HydrationLog.objects.filter(
+            user=user, date__range=(start_date, end_date)
+        ).order_by('date').values_list('date', 'amount_ml', 'daily_goal_ml')
+
+        dates, amounts, goals, progress = [], [], [], []
+        for day, amount_ml, goal_ml in logs:
+            dates.append(day)
+            amounts.append(amount_ml)
+            goals.append(goal_ml)
+            progress.append(
+                min(round(amount_ml / goal_ml * 100, 2), 100)
+                if goal_ml else 0)
+
+        return {
+            'start_date': start_date,
+            'end_date': end_date,
+            'dates': dates,
+            'amount_ml': amounts,
+            'goal_ml': goals,
+            'progress': progress,
         }
+
+    @classmethod
+    def _query_streaks(cls, user_id, today: date) -> Dict:
+        """
+        Gaps-and-islands over goal-met days: consecutive dates share the
+        same `day number - row number`, so each island is one group. The
+        current streak is the island that reaches yesterday or today.
+        """
+        day_number = cls.DAY_NUMBER_SQL.get(
+            connection.vendor, cls.DAY_NUMBER_SQL['sqlite'])
+        table = connection.ops.quote_name(HydrationLog._meta.db_table)
+        sql = f"""
+            WITH met AS (
+                SELECT date,
+                       {day_number} - ROW_NUMBER() OVER (ORDER BY date) AS grp
+                FROM {table}
+                WHERE user_id = %s
+                  AND daily_goal_ml > 0
+                  AND amount_ml >= daily_goal_ml
+                  AND date <= %s
+            ), islands AS (
+                SELECT MAX(date) AS end_date, COUNT(*) AS length
+                FROM met
+                GROUP BY grp
+            )
+            SELECT COALESCE(MAX(length), 0),
+                   COALESCE(MAX(CASE WHEN end_date >= %s
+                                     THEN length END), 0)
+            FROM islands
+        """
+        with connection.cursor() as cursor:
+            cursor.execute(sql, [user_id, today, today - timedelta(days=1)])
+            longest, current = cursor.fetchone()
+
+        return {'current_streak': current, 'longest_streak': longest}
+
+    @classmethod
+    def get_streaks(cls, user: 'User') -> Dict:
+        """Current and longest goal-met streaks, cached per user and day"""
+        today = timezone.localdate()
+        key = cls.STREAK_CACHE_KEY.format(
+            user_id=user.pk, today=today.isoformat())
+
+        streaks = cache.get(key)
+        if streaks is None:
+            streaks = cls._query_streaks(user.pk, today)
+            cache.set(key, streaks, cls.STREAK_CACHE_TIMEOUT)
+        return streaks
+
+    @classmethod
+    def invalidate_streaks(cls, user_id) -> None:
+        today = timezone.localdate()
+        cache.delete_many([
+            cls.STREAK_CACHE_KEY.format(
+                user_id=user_id,
+                today=(today + timedelta(days=offset)).isoformat())
+            for offset in (-1, 0, 1)
+        ])
+
+
+def _adherence_percent(taken: float, expected: float) -> float:
+    if expected <= 0:
+        return 0
+    return min(round(taken / expected * 100, 2), 100)
+
+
+def summarize_nutrition(totals: Dict, goal) -> Tuple[Dict, Dict]:
+    """
+    Normalize an aggregate of the day's nutrition logs and compute the
+    percent progress towards each goal
+    """
+    # Handle None values from empty aggregation
+    totals = {
+        key: totals[key] or 0
+        for key in ('calories', 'carbs', 'protein', 'fat')
+    }
+
+    progress = {}
+    for key, value in totals.items():
+        target = getattr(goal, key)
+        progress[key] = (
+            min(100, round((value / target) * 100, 2))
+            if target > 0 and value else 0
+        )
+    return totals, progress
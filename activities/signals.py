@@ -0,0 +1,116 @@
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from activities.food_search import invalidate_food_trie
+from activities.models import (
+    FoodSuggestion, HydrationLog, MedicationLog, NutritionLog)
+from activities.services import HydrationService, NutritionService
+from core.models import DailyEntry, SyncTombstone
+from customers.models import Customer, CustomerDiaryEntry, WeightEntry
+
+User = get_user_model()
+
+# Model -> sync source name, see activities.sync.SYNC_SOURCES
+TOMBSTONE_MODELS = {
+    DailyEntry: 'daily_entry',
+    HydrationLog: 'hydration_log',
+    MedicationLog: 'medication_log',
+    NutritionLog: 'nutrition_log',
+    WeightEntry: 'weight_entry',
+    CustomerDiaryEntry: 'diary_entry',
+}
+
+
+def _get_user_id(instance):
+    if isinstance(instance, MedicationLog):
+        return instance.medication.user_id
+    if hasattr(instance, 'customer_id'):
+        return Customer.objects.filter(
+            pk=instance.customer_id).values_list('user_id', flat=True).first()
+    return instance.user_id
+
+
+def _deleted_with_owner(origin):
+    """True when a delete cascades from a user or customer"""
+    origin_model = getattr(origin, 'model', type(origin))
+    return issubclass(origin_model, (User, Customer))
+
+
+def record_tombstone(sender, instance, origin=None, **kwargs):
+    """Record hard deletes of synced rows so delta sync can report them"""
+    # Rows removed along with their user/customer need no tombstone, and
+    # creating one would reference a user that is being deleted
+    if _deleted_with_owner(origin):
+        return
+
+    user_id = _get_user_id(instance)
+    if user_id is None:
+        return
+
+    SyncTombstone.objects.create(
+        user_id=user_id,
+        model_name=TOMBSTONE_MODELS[sender],
+        object_id=str(instance.pk),
+    )
+
+
+for model in TOMBSTONE_MODELS:
+    receiver(post_delete, sender=model, dispatch_uid=(
+        f"sync_tombstone_{model._meta.label_lower}"))(record_tombstone)
+
+
+@receiver(post_save, sender=FoodSuggestion)
+@receiver(post_delete, sender=FoodSuggestion)
+def refresh_food_trie(sender, **kwargs):
+    """Rebuild the in-process search trie on its next use"""
+    invalidate_food_trie()
+
+
+NUTRITION_ROLLUP_FIELDS = ('customer_id', 'date', *NutritionService.NUTRIENTS)
+
+
+@receiver(pre_save, sender=NutritionLog)
+def remember_nutrition_log(sender, instance, raw=False, **kwargs):
+    """
+    Keep the stored values of an updated log to take out of its rollup.
+    A renamed log counts as a use of its new food.
+    """
+    instance._rollup_previous = None
+    if not raw and not instance._state.adding:
+        instance._rollup_previous = NutritionLog.objects.filter(
+            pk=instance.pk).values(*NUTRITION_ROLLUP_FIELDS, 'name').first()
+        previous = instance._rollup_previous
+        if previous and previous['name'] != instance.name:
+            instance.usage_pending = True
+
+
+@receiver(post_save, sender=NutritionLog)
+def add_nutrition_log_to_rollup(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    previous = getattr(instance, '_rollup_previous', None)
+    if previous:
+        NutritionService.apply_log_delta(
+            previous['customer_id'], previous['date'], previous, -1)
+    NutritionService.apply_log_delta(
+        instance.customer_id, instance.date,
+        {key: getattr(instance, key) for key in NutritionService.NUTRIENTS},
+        1)
+
+
+@receiver(post_delete, sender=NutritionLog)
+def remove_nutrition_log_from_rollup(sender, instance, origin=None, **kwargs):
+    # The rollups go away with their customer
+    if _deleted_with_owner(origin):
+        return
+    NutritionService.apply_log_delta(
+        instance.customer_id, instance.date,
+        {key: getattr(instance, key) for key in NutritionService.NUTRIENTS},
+        -1)
+
+
+@receiver(post_save, sender=HydrationLog)
+@receiver(post_delete, sender=HydrationLog)
+def invalidate_hydration_streaks(sender, instance, **kwargs):
+    HydrationService.invalidate_streaks(instance.user_id)
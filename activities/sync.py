@@ -0,0 +1,353 @@
+"""
+Offline-first delta sync for the daily tracking models.
+
+Every synced model is described by a SyncSource. A pull returns the rows
+changed since an opaque cursor, merged across sources in
+(changed_at, source, pk) order, plus tombstones for hard deletes. A push
+applies client mutations with last-writer-wins conflict resolution.
+"""
+import base64
+import binascii
+import json
+import logging
+from typing import Dict, List, Optional
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import F, Q
+from django.db.models.functions import Coalesce
+from django.utils.dateparse import parse_datetime
+from django.utils.timezone import is_naive, make_aware
+
+from activities.models import (
+    HydrationLog, Medication, MedicationLog, NutritionLog)
+from core.models import DailyEntry, SyncTombstone
+from customers.models import CustomerDiaryEntry, WeightEntry
+
+logger = logging.getLogger(__name__)
+
+SYNC_PAGE_SIZE = 200
+MAX_SYNC_PAGE_SIZE = 1000
+TOMBSTONE_SOURCE = 'deleted'
+
+
+class SyncError(Exception):
+    pass
+
+
+def _validation_message(error):
+    if hasattr(error, 'error_dict'):
+        return "; ".join(
+            f"{field}: {' '.join(messages)}"
+            for field, messages in error.message_dict.items())
+    return " ".join(error.messages)
+
+
+class SyncSource:
+    """
+    Describes how one model takes part in delta sync
+
+    owner: 'user' or 'customer', the object rows are scoped to
+    owner_lookup: queryset lookup from the model to that owner
+    key_fields: natural key used to find a row when no id is sent
+    writable_fields: fields a client mutation may set
+    """
+
+    def __init__(
+        self, name, model, fields, owner='user', owner_lookup=None,
+        key_fields=(), writable_fields=(), fallback_timestamp=None
+    ):
+        self.name = name
+        self.model = model
+        self.fields = fields
+        self.owner = owner
+        self.owner_lookup = owner_lookup or owner
+        self.key_fields = key_fields
+        self.writable_fields = writable_fields
+        self.fallback_timestamp = fallback_timestamp
+
+    def get_owner(self, user):
+        return user.customer if self.owner == 'customer' else user
+
+    def get_queryset(self, user):
+        changed_at = (
+            Coalesce('updated_at', self.fallback_timestamp)
+            if self.fallback_timestamp else F('updated_at')
+        )
+        return self.model.objects.filter(
+            **{self.owner_lookup: self.get_owner(user)}
+        ).annotate(changed_at=changed_at)
+
+    def after(self, position):
+        """Keyset filter for rows that sort after the cursor position"""
+        changed_at, name, key = position
+        if self.name > name:
+            return Q(changed_at__gte=changed_at)
+        if self.name < name:
+            return Q(changed_at__gt=changed_at)
+        pk = self.model._meta.pk.to_python(key)
+        return Q(changed_at__gt=changed_at) | Q(changed_at=changed_at, pk__gt=pk)
+
+    def get_changes(self, user, position, limit):
+        queryset = self.get_queryset(user)
+        if position:
+            queryset = queryset.filter(self.after(position))
+        return list(
+            queryset.order_by('changed_at', 'pk')
+            .values('pk', 'changed_at', *self.fields)[:limit]
+        )
+
+    def serialize(self, user, instance):
+        row = self.get_queryset(user).filter(pk=instance.pk).values(
+            'pk', 'changed_at', *self.fields).first()
+        if row is not None:
+            row['id'] = row.pop('pk')
+        return row
+
+    def find(self, user, object_id, data):
+        queryset = self.get_queryset(user)
+        if object_id is not None:
+            return queryset.filter(pk=object_id).first()
+        if self.key_fields and all(key in data for key in self.key_fields):
+            return queryset.filter(
+                **{key: data[key] for key in self.key_fields}).first()
+        return None
+
+    def build(self, user, data):
+        """New instance for an upsert that matched no existing row"""
+        return self.model(**{
+            self.owner: self.get_owner(user),
+            **{key: data[key] for key in self.key_fields if key in data},
+        })
+
+    def apply(self, instance, data):
+        """
+        Set the writable fields from client data, coerced to the model
+        field types, and validate the instance before saving
+        """
+        try:
+            for field in self.writable_fields:
+                if field in data:
+                    model_field = self.model._meta.get_field(field)
+                    setattr(
+                        instance, model_field.attname,
+                        model_field.to_python(data[field]))
+            instance.full_clean()
+        except ValidationError as e:
+            raise SyncError(_validation_message(e))
+        instance.save()
+
+
+class MedicationLogSyncSource(SyncSource):
+
+    def build(self, user, data):
+        medication = Medication.objects.filter(
+            id=data.get('medication_id'), user=user).first()
+        if not medication:
+            raise SyncError("Medication not found")
+
+        dose_index = data.get('dose_index')
+        if dose_index is None or not (
+                0 <= dose_index < len(medication.dose_times)):
+            raise SyncError(f"Invalid dose index: {dose_index}")
+
+        return MedicationLog(
+            medication=medication,
+            date=data.get('date'),
+            dose_index=dose_index,
+            dose_time=medication.dose_times[dose_index],
+        )
+
+
+class TombstoneSource(SyncSource):
+
+    def __init__(self):
+        super().__init__(
+            TOMBSTONE_SOURCE, SyncTombstone, ('model_name', 'object_id'))
+
+    def get_queryset(self, user):
+        return SyncTombstone.objects.filter(user=user).annotate(
+            changed_at=F('deleted_at'))
+
+
+SYNC_SOURCES = {
+    source.name: source
+    for source in (
+        SyncSource(
+            'daily_entry', DailyEntry,
+            ('date', 'daily_data', 'ratings', 'created_at'),
+            key_fields=('date',),
+            writable_fields=('daily_data', 'ratings'),
+        ),
+        SyncSource(
+            'hydration_log', HydrationLog,
+            ('date', 'amount_ml', 'glass_size_ml', 'daily_goal_ml',
+             'created_at'),
+            key_fields=('date',),
+            writable_fields=('amount_ml', 'glass_size_ml', 'daily_goal_ml'),
+        ),
+        MedicationLogSyncSource(
+            'medication_log', MedicationLog,
+            ('medication_id', 'date', 'dose_index', 'dose_time', 'taken',
+             'taken_at', 'created_at'),
+            owner_lookup='medication__user',
+            key_fields=('medication_id', 'date', 'dose_index'),
+            writable_fields=('taken', 'taken_at'),
+        ),
+        SyncSource(
+            'nutrition_log', NutritionLog,
+            ('date', 'name', 'quantity', 'calories', 'carbs', 'protein',
+             'fat', 'created_at'),
+            owner='customer',
+            writable_fields=(
+                'date', 'name', 'quantity', 'calories', 'carbs', 'protein',
+                'fat'),
+        ),
+        SyncSource(
+            'weight_entry', WeightEntry,
+            ('weight', 'unit', 'entry_date', 'is_deleted'),
+            owner='customer',
+            writable_fields=('weight', 'unit', 'entry_date'),
+        ),
+        SyncSource(
+            'diary_entry', CustomerDiaryEntry,
+            ('entry_date', 'content', 'is_deleted', 'created_at'),
+            owner='customer',
+            key_fields=('entry_date',),
+            writable_fields=('content',),
+            fallback_timestamp='created_at',
+        ),
+    )
+}
+TOMBSTONES = TombstoneSource()
+
+
+def encode_cursor(changed_at, name, pk):
+    payload = json.dumps(
+        {'t': changed_at.isoformat(), 's': name, 'k': str(pk)},
+        separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Decode an opaque cursor into (changed_at, source, pk)"""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded))
+        changed_at = parse_datetime(payload['t'])
+        name, key = payload['s'], payload['k']
+    except (binascii.Error, ValueError, KeyError, TypeError):
+        raise SyncError("Invalid sync cursor")
+    if changed_at is None:
+        raise SyncError("Invalid sync cursor")
+    return changed_at, name, key
+
+
+def pull_changes(
+    user, cursor: Optional[str] = None, limit: int = SYNC_PAGE_SIZE
+) -> Dict:
+    """
+    Return up to `limit` rows changed after the cursor across all synced
+    models, grouped per model, with the cursor for the next page.
+    Every source runs one keyset query, so a page costs a fixed number of
+    queries however many rows changed.
+    """
+    position = decode_cursor(cursor) if cursor else None
+
+    candidates = []
+    for source in (*SYNC_SOURCES.values(), TOMBSTONES):
+        for row in source.get_changes(user, position, limit + 1):
+            candidates.append((row['changed_at'], source.name, row['pk'], row))
+
+    candidates.sort(key=lambda candidate: candidate[:3])
+    page = candidates[:limit]
+
+    changes = {name: [] for name in SYNC_SOURCES}
+    deleted = []
+    for _, name, pk, row in page:
+        row['id'] = row.pop('pk')
+        if name == TOMBSTONE_SOURCE:
+            deleted.append({
+                'model': row['model_name'],
+                'id': row['object_id'],
+                'changed_at': row['changed_at'],
+            })
+        else:
+            changes[name].append(row)
+
+    if page:
+        changed_at, name, pk, _ = page[-1]
+        cursor = encode_cursor(changed_at, name, pk)
+
+    return {
+        'changes': changes,
+        'deleted': deleted,
+        'next_cursor': cursor,
+        'has_more': len(candidates) > limit,
+    }
+
+
+def _changed_at(instance):
+    return getattr(instance, 'updated_at', None) or getattr(
+        instance, 'created_at', None)
+
+
+def apply_mutation(user, mutation: Dict) -> Dict:
+    """
+    Apply one client mutation with last-writer-wins: the write is rejected
+    as a conflict when the server row changed after the client's copy.
+    """
+    source = SYNC_SOURCES.get(mutation['model'])
+    result = {
+        'model': mutation['model'],
+        'op': mutation['op'],
+        'id': mutation.get('id'),
+        'status': 'error',
+        'error': None,
+        'row': None,
+    }
+    if source is None:
+        result['error'] = "Unknown model"
+        return result
+
+    data = mutation.get('data') or {}
+    client_updated_at = mutation['client_updated_at']
+    if is_naive(client_updated_at):
+        client_updated_at = make_aware(client_updated_at)
+
+    try:
+        with transaction.atomic():
+            instance = source.find(user, mutation.get('id'), data)
+
+            server_changed_at = instance and _changed_at(instance)
+            if server_changed_at and server_changed_at > client_updated_at:
+                result['status'] = 'conflict'
+                result['row'] = source.serialize(user, instance)
+                return result
+
+            if mutation['op'] == 'delete':
+                if instance is not None:
+                    instance.delete()
+                result['status'] = 'applied'
+                return result
+
+            if instance is None:
+                instance = source.build(user, data)
+            source.apply(instance, data)
+    except SyncError as e:
+        result['error'] = str(e)
+        return result
+    except Exception:
+        logger.exception("Failed to apply %s mutation", mutation['model'])
+        result['error'] = "Failed to apply mutation"
+        return result
+
+    result['id'] = str(instance.pk)
+    result['status'] = 'applied'
+    result['row'] = source.serialize(user, instance)
+    return result
+
+
+def push_mutations(user, mutations: List[Dict]) -> List[Dict]:
+    """Apply a batch of client mutations, each in its own savepoint"""
+    return [apply_mutation(user, mutation) for mutation in mutations]
@@ -1,3 +1,72 @@
+from datetime import date, timedelta
+
 from django.test import TestCase
 
-# Create your tests here.
+from accounts.models import User
+from activities.models import Medication, MedicationLog
+from activities.services import MedicationService
+
+TARGET_DATE = date(2026, 3, 10)
+
+
+class MedicationDoseQueryCountTests(TestCase):
+    """
+    Building the dose lists must take a fixed number of queries, one for
+    the medications and one for all of their logs, however many
+    medications, doses and days there are.
+    """
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='meds@example.com',
+            email='meds@example.com',
+            password='password',
+        )
+
+    def add_medications(self, count, days=1):
+        for index in range(count):
+            medication = Medication.objects.create(
+                user=self.user,
+                name=f"Medication {index}",
+                dosage="1 tablet",
+                times_per_period=3,
+            )
+            for offset in range(days):
+                for dose_index, dose_time in enumerate(
+                        medication.dose_times):
+                    MedicationLog.objects.create(
+                        medication=medication,
+                        date=TARGET_DATE + timedelta(days=offset),
+                        dose_index=dose_index,
+                        dose_time=dose_time,
+                        taken=dose_index % 2 == 0,
+                    )
+
+    def test_doses_for_a_date_use_constant_queries(self):
+        self.add_medications(1)
+        with self.assertNumQueries(2):
+            result = MedicationService.get_medications_with_doses(
+                self.user, TARGET_DATE)
+        self.assertEqual(len(result), 1)
+
+        self.add_medications(14)
+        with self.assertNumQueries(2):
+            result = MedicationService.get_medications_with_doses(
+                self.user, TARGET_DATE)
+        self.assertEqual(len(result), 15)
+        self.assertTrue(all(len(med['doses']) == 3 for med in result))
+
+    def test_dose_grid_uses_constant_queries(self):
+        self.add_medications(2, days=7)
+        end_date = TARGET_DATE + timedelta(days=6)
+        with self.assertNumQueries(2):
+            grid = MedicationService.get_medication_dose_grid(
+                self.user, TARGET_DATE, end_date)
+        self.assertEqual(len(grid), 7)
+
+        self.add_medications(10, days=7)
+        with self.assertNumQueries(2):
+            grid = MedicationService.get_medication_dose_grid(
+                self.user, TARGET_DATE, end_date)
+        self.assertEqual(len(grid), 7)
+        self.assertTrue(all(len(day['medications']) == 12 for day in grid))
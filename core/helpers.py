@@ -2,8 +2,8 @@ import base64
 import collections
 import math
 import os
-import random
 import re
+import secrets
 import string
 from decimal import ROUND_HALF_UP, Decimal
 from numbers import Number
@@ -45,7 +45,7 @@ from .services import generate_errors
 
 
 def generate_unique_id(size=8, chars=string.ascii_lowercase + string.digits):
-    return "".join(random.choice(chars) for _ in range(size))
+    return "".join(secrets.choice(chars) for _ in range(size))
 
 
 def generate_order_id(auto_id=""):
@@ -184,7 +184,7 @@ def get_current_roles(user):
 
 
 def generate_otp(size=4, chars=string.digits):
-    return "".join(random.choice(chars) for _ in range(size))
+    return "".join(secrets.choice(chars) for _ in range(size))
 
 
 def flatten(d, parent_key="", sep="_"):
@@ -0,0 +1,150 @@
+import asyncio
+import time
+
+import httpx
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+# Read-heavy endpoints that have an async variant under api/v1/async/
+BENCHMARK_ENDPOINTS = [
+    'period/customer-data/',
+    'hydration/hydration/{date}',
+    'nutrition/summary/{date}',
+    'medication/medications/by-date/{date}',
+    'general/daily-tips/',
+]
+
+
+def percentile(values, percent):
+    """Nearest-rank percentile of a sorted list"""
+    if not values:
+        return 0
+    index = max(int(round(percent / 100 * len(values))) - 1, 0)
+    return values[min(index, len(values) - 1)]
+
+
+async def run_load(url, headers, total, concurrency, timeout):
+    """
+    Fire `total` GET requests at the url from `concurrency` workers and
+    return (elapsed seconds, sorted latencies in ms, error count)
+    """
+    latencies = []
+    errors = 0
+    remaining = iter(range(total))
+
+    async with httpx.AsyncClient(
+        headers=headers,
+        timeout=timeout,
+        limits=httpx.Limits(max_connections=concurrency),
+    ) as client:
+
+        async def worker():
+            nonlocal errors
+            for _ in remaining:
+                started = time.perf_counter()
+                try:
+                    response = await client.get(url)
+                    if response.status_code >= 500:
+                        errors += 1
+                except httpx.HTTPError:
+                    errors += 1
+                latencies.append((time.perf_counter() - started) * 1000)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return elapsed, latencies, errors
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare requests/sec and latency of the WSGI and ASGI deployments '
+        'on the read-heavy endpoints. Start both servers first, e.g. '
+        '`gunicorn shecare.wsgi` and `uvicorn shecare.asgi:application`.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--wsgi-url',
+            default='http://127.0.0.1:8000',
+            help='Base URL of the WSGI deployment',
+        )
+        parser.add_argument(
+            '--asgi-url',
+            default='http://127.0.0.1:8001',
+            help='Base URL of the ASGI deployment',
+        )
+        parser.add_argument(
+            '--token',
+            required=True,
+            help='JWT access token of a customer user',
+        )
+        parser.add_argument(
+            '--endpoint',
+            action='append',
+            dest='endpoints',
+            help=(
+                'Endpoint path relative to api/v1/, {date} is replaced '
+                'with today. Can be repeated; defaults to all async '
+                'endpoints'
+            ),
+        )
+        parser.add_argument(
+            '--requests',
+            type=int,
+            default=2000,
+            help='Requests per endpoint and deployment (default: 2000)',
+        )
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            default=50,
+            help='Number of concurrent clients (default: 50)',
+        )
+        parser.add_argument(
+            '--timeout',
+            type=float,
+            default=30,
+            help='Per-request timeout in seconds (default: 30)',
+        )
+
+    def handle(self, *args, **options):
+        if options['requests'] < 1 or options['concurrency'] < 1:
+            raise CommandError('--requests and --concurrency must be >= 1')
+
+        today = timezone.now().date().isoformat()
+        endpoints = options['endpoints'] or BENCHMARK_ENDPOINTS
+        headers = {'Authorization': f"Bearer {options['token']}"}
+        deployments = [
+            ('WSGI', options['wsgi_url'].rstrip('/') + '/api/v1/'),
+            ('ASGI', options['asgi_url'].rstrip('/') + '/api/v1/async/'),
+        ]
+
+        self.stdout.write(
+            f"{options['requests']} requests per run, "
+            f"concurrency {options['concurrency']}"
+        )
+        self.stdout.write(
+            f"{'Endpoint':<40} {'Server':<6} {'req/s':>9} "
+            f"{'p50 ms':>9} {'p99 ms':>9} {'errors':>7}"
+        )
+
+        for endpoint in endpoints:
+            path = endpoint.lstrip('/').format(date=today)
+            for name, base_url in deployments:
+                elapsed, latencies, errors = asyncio.run(run_load(
+                    base_url + path,
+                    headers,
+                    options['requests'],
+                    options['concurrency'],
+                    options['timeout'],
+                ))
+                self.stdout.write(
+                    f"{path:<40} {name:<6} "
+                    f"{len(latencies) / elapsed:>9.1f} "
+                    f"{percentile(latencies, 50):>9.1f} "
+                    f"{percentile(latencies, 99):>9.1f} "
+                    f"{errors:>7}"
+                )
@@ -0,0 +1,76 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.http import HttpRequest
+from django.test.utils import CaptureQueriesContext
+from ninja_jwt.authentication import JWTAuth
+
+from accounts.apis.v1.authentication import (
+    ClaimsJWTAuth, PrincipalJWTAuth, issue_tokens)
+from accounts.models import User
+from core.management.commands.benchmark_api import percentile
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare the per-request cost of the authentication modes for one '
+        'user: the default JWTAuth user query, the select_related '
+        'principal and the stateless claims mode.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--email',
+            required=True,
+            help='Email of an active customer user',
+        )
+        parser.add_argument(
+            '--requests',
+            type=int,
+            default=2000,
+            help='Authentications per mode (default: 2000)',
+        )
+
+    def handle(self, *args, **options):
+        if options['requests'] < 1:
+            raise CommandError('--requests must be >= 1')
+
+        user = User.objects.filter(
+            email=options['email'], is_active=True).first()
+        if user is None:
+            raise CommandError(f"No active user {options['email']}")
+        token = str(issue_tokens(user).access_token)
+
+        modes = [
+            ('jwt', JWTAuth()),
+            ('principal', PrincipalJWTAuth()),
+            ('claims', ClaimsJWTAuth()),
+        ]
+
+        self.stdout.write(f"{options['requests']} authentications per mode")
+        self.stdout.write(
+            f"{'Mode':<18} {'p50 us':>9} {'p99 us':>9} {'mean us':>9} "
+            f"{'queries':>8}"
+        )
+
+        for name, auth in modes:
+            # Warm up token parsing and caches outside the measurement
+            auth.authenticate(HttpRequest(), token)
+
+            latencies = []
+            with CaptureQueriesContext(connection) as queries:
+                for _ in range(options['requests']):
+                    started = time.perf_counter()
+                    auth.authenticate(HttpRequest(), token)
+                    latencies.append(
+                        (time.perf_counter() - started) * 1000000)
+
+            latencies.sort()
+            self.stdout.write(
+                f"{name:<18} "
+                f"{percentile(latencies, 50):>9.1f} "
+                f"{percentile(latencies, 99):>9.1f} "
+                f"{sum(latencies) / len(latencies):>9.1f} "
+                f"{len(queries) / options['requests']:>8.2f}"
+            )
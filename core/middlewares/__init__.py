@@ -1,4 +1,4 @@
 from .check_mode import CheckModeMiddleware
-from .requests import RequestMiddleware
+from .requests import RequestMiddleware, get_current_request
 
-__all__ = (CheckModeMiddleware, RequestMiddleware)
+__all__ = (CheckModeMiddleware, RequestMiddleware, get_current_request)
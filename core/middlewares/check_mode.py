@@ -1,7 +1,66 @@
 import json
+import time
+from django.core.cache import cache
 from django.http.response import HttpResponseRedirect, HttpResponse
 from django.urls import reverse
 
+from core.helpers import is_ajax
+
+# Flags are served from a process-local copy refreshed every
+# MODE_LOCAL_TTL seconds from the cache backend, which Mode's post_save
+# updates. With a cache shared by all workers a change reaches every
+# worker within MODE_LOCAL_TTL seconds. The default LocMemCache is per
+# process, so there the post_save only updates the saving process; the
+# others reload from the database once their cache entry expires, within
+# MODE_CACHE_TIMEOUT + MODE_LOCAL_TTL = 2 * MODE_LOCAL_TTL seconds.
+MODE_CACHE_KEY = "core:mode"
+MODE_LOCAL_TTL = 5
+MODE_CACHE_TIMEOUT = MODE_LOCAL_TTL
+
+_local_mode = {"flags": None, "expires_at": 0}
+
+
+def _load_mode_flags():
+    from core.models import Mode
+
+    mode, created = Mode.objects.get_or_create(id=1, defaults={'readonly': False, 'maintenance': False, 'down': False, })
+    return {
+        'readonly': mode.readonly,
+        'maintenance': mode.maintenance,
+        'down': mode.down,
+    }
+
+
+def get_mode_flags():
+    """
+    Return the readonly/maintenance/down flags without touching the
+    database on the hot path
+    """
+    now = time.monotonic()
+    if _local_mode["flags"] is not None and now < _local_mode["expires_at"]:
+        return _local_mode["flags"]
+
+    flags = cache.get(MODE_CACHE_KEY)
+    if flags is None:
+        flags = _load_mode_flags()
+        cache.set(MODE_CACHE_KEY, flags, MODE_CACHE_TIMEOUT)
+
+    _local_mode["flags"] = flags
+    _local_mode["expires_at"] = now + MODE_LOCAL_TTL
+    return flags
+
+
+def publish_mode_flags(mode):
+    """Broadcast new flags to all workers through the cache backend"""
+    flags = {
+        'readonly': mode.readonly,
+        'maintenance': mode.maintenance,
+        'down': mode.down,
+    }
+    cache.set(MODE_CACHE_KEY, flags, MODE_CACHE_TIMEOUT)
+    _local_mode["flags"] = flags
+    _local_mode["expires_at"] = time.monotonic() + MODE_LOCAL_TTL
+
 
 class CheckModeMiddleware(object):
 
@@ -13,15 +72,12 @@ class CheckModeMiddleware(object):
         return response
 
     def process_view(self, request, view_func, view_args, view_kwargs):
-        from core.models import Mode
-
-        mode, created = Mode.objects.get_or_create(id=1, defaults={'readonly': False, 'maintenance': False, 'down': False, })
-        readonly = mode.readonly
-        maintenance = mode.maintenance
-        down = mode.down
+        flags = get_mode_flags()
+        readonly = flags['readonly']
+        down = flags['down']
         if not request.user.is_superuser:
             if down:
-                if request.is_ajax():
+                if is_ajax(request):
                     response_data = {}
                     response_data['status'] = 'false'
                     response_data['message'] = "Application currently down. Please try again later."
@@ -30,11 +86,11 @@ class CheckModeMiddleware(object):
                 else:
                     return HttpResponseRedirect(reverse('down'))
             elif readonly:
-                if request.is_ajax():
+                if is_ajax(request):
                     response_data = {}
                     response_data['status'] = 'false'
                     response_data['message'] = "Application now readonly mode. please try again later."
                     response_data['static_message'] = "true"
                     return HttpResponse(json.dumps(response_data), content_type='application/javascript')
                 else:
-                    return HttpResponseRedirect(reverse('read_only'))
\ No newline at end of file
+                    return HttpResponseRedirect(reverse('read_only'))
@@ -1,20 +1,41 @@
-import threading
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+
+# Holds the request being handled in the current context. A ContextVar is
+# isolated per thread and per asyncio task, so it is safe under both WSGI
+# and ASGI, and it is reset when the request finishes.
+_current_request = ContextVar("current_request", default=None)
+
+
+def get_current_request():
+    """Return the request handled in the current context, if any"""
+    return _current_request.get()
 
 
 class RequestMiddleware:
+    sync_capable = True
+    async_capable = True
 
-    def __init__(self, get_response, thread_local=threading.local()):
+    def __init__(self, get_response):
         self.get_response = get_response
-        self.thread_local = thread_local
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
 
     def __call__(self, request):
-        # Code to be executed for each request before
-        # the view (and later middleware) are called.
-        self.thread_local.current_request = request
-
-        response = self.get_response(request)
+        if self.async_mode:
+            return self.__acall__(request)
 
-        # Code to be executed for each request/response after
-        # the view is called.
+        token = _current_request.set(request)
+        try:
+            return self.get_response(request)
+        finally:
+            _current_request.reset(token)
 
-        return response
+    async def __acall__(self, request):
+        token = _current_request.set(request)
+        try:
+            return await self.get_response(request)
+        finally:
+            _current_request.reset(token)
@@ -7,7 +7,7 @@ from django.conf import settings
 from django.contrib.auth import get_user_model
 
 from core.helpers import transform_string
-from core.middlewares import RequestMiddleware
+from core.middlewares import get_current_request
 
 
 class ActiveManager(models.Manager):
@@ -100,8 +100,7 @@ class BaseModel(models.Model):
             self.updated_at = timezone.now()
 
     def save(self, request=None, *args, **kwargs):
-        request = RequestMiddleware(get_response=None)
-        if request := getattr(request.thread_local, "current_request", None):
+        if request := request or get_current_request():
             self.base_data(request)
         super().save(*args, **kwargs)
 
@@ -153,6 +152,28 @@ class DailyEntry(models.Model):
     class Meta:
         unique_together = ("user", "date")
         ordering = ["-date"]
+        indexes = [
+            models.Index(fields=["user", "updated_at"]),
+        ]
 
     def __str__(self):
         return f"{self.user} - {self.date}"
+
+
+class SyncTombstone(models.Model):
+    """Record of a hard-deleted row so delta sync can report the delete"""
+    user = models.ForeignKey(
+        get_user_model(), on_delete=models.CASCADE,
+        related_name="sync_tombstones")
+    model_name = models.CharField(max_length=50)
+    object_id = models.CharField(max_length=64)
+    deleted_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["deleted_at"]
+        indexes = [
+            models.Index(fields=["user", "deleted_at"]),
+        ]
+
+    def __str__(self):
+        return f"{self.model_name} {self.object_id} deleted"
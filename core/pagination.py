@@ -1,10 +1,20 @@
-from typing import List, Optional, Any, Generic
+import base64
+import binascii
+import json
+from typing import List, Optional, Any, Generic, Sequence
+from django.core.exceptions import ValidationError
+from django.db import connections
+from django.db.models import Q, QuerySet
 from ninja import Schema
+from ninja.errors import HttpError
+from ninja.pagination import PaginationBase
 from ninja_extra.pagination import PageNumberPaginationExtra
 from ninja_extra.schemas.response import Url, T
+from ninja_extra.urls import replace_query_param
 from collections import OrderedDict
 from django.core.paginator import Page
 from ninja.types import DictStrAny
+from pydantic import Field
 
 
 class BasePaginatedResponseSchema(Schema):
@@ -54,3 +64,145 @@ class CustomPagination(PageNumberPaginationExtra):
                 ("results", list(page)),
             ]
         )
+
+
+class CursorPaginatedResponseSchema(Schema, Generic[T]):
+    next: Optional[Url]
+    next_cursor: Optional[str]
+    count: Optional[int]
+    results: List[T]
+
+
+def estimate_count(queryset: QuerySet) -> int:
+    """
+    Approximate row count of a queryset. On PostgreSQL this is the
+    planner's estimate, which costs no scan; other backends fall back to
+    an exact COUNT.
+    """
+    connection = connections[queryset.db]
+    if connection.vendor != "postgresql":
+        return queryset.count()
+
+    sql, params = queryset.order_by().query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+class KeysetPagination(PaginationBase):
+    """
+    Keyset (cursor) pagination over a fixed ordering, e.g.
+    ('-start_date', '-id'). Each page is a WHERE on the ordering fields of
+    the previous page's last row, so deep pages cost the same as the first
+    and no COUNT query is run. Clients follow `next_cursor` and can opt in
+    to an approximate total with `include_total`.
+
+    The ordering must end in a unique field and its fields can not be
+    null.
+    """
+
+    class Input(Schema):
+        cursor: Optional[str] = None
+        page_size: int = Field(20, gt=0, le=100)
+        include_total: bool = False
+
+    cursor_query_param = "cursor"
+
+    def __init__(
+        self,
+        ordering: Sequence[str] = ("-created_at", "-id"),
+        page_size: int = 20,
+        max_page_size: int = 100,
+        pass_parameter: Optional[str] = None,
+    ) -> None:
+        super().__init__(pass_parameter=pass_parameter)
+        self.ordering = tuple(ordering)
+        self.page_size = page_size
+        self.max_page_size = max_page_size
+        self.Input = self.create_input()  # type:ignore
+
+    def create_input(self):
+        class DynamicInput(KeysetPagination.Input):
+            page_size: int = Field(
+                self.page_size, gt=0, le=self.max_page_size)
+
+        return DynamicInput
+
+    def _fields(self):
+        return [
+            (name.lstrip("-"), name.startswith("-")) for name in self.ordering
+        ]
+
+    def encode_cursor(self, item) -> str:
+        values = [getattr(item, name) for name, _ in self._fields()]
+        # str() keeps full microsecond precision, which the keyset
+        # comparison needs
+        payload = json.dumps(values, default=str, separators=(",", ":"))
+        return base64.urlsafe_b64encode(
+            payload.encode()).decode().rstrip("=")
+
+    def decode_cursor(self, queryset: QuerySet, cursor: str) -> list:
+        fields = self._fields()
+        try:
+            padded = cursor + "=" * (-len(cursor) % 4)
+            values = json.loads(base64.urlsafe_b64decode(padded))
+            if not isinstance(values, list) or len(values) != len(fields):
+                raise ValueError
+            opts = queryset.model._meta
+            return [
+                (opts.pk if name == "pk" else opts.get_field(name))
+                .to_python(value)
+                for (name, _), value in zip(fields, values)
+            ]
+        except (binascii.Error, ValueError, TypeError, ValidationError):
+            raise HttpError(400, "Invalid cursor")
+
+    def after(self, values) -> Q:
+        """Rows that sort after the given ordering values"""
+        condition = Q()
+        equal = Q()
+        for (name, descending), value in zip(self._fields(), values):
+            lookup = "lt" if descending else "gt"
+            condition |= equal & Q(**{f"{name}__{lookup}": value})
+            equal &= Q(**{name: value})
+        return condition
+
+    def paginate_queryset(
+        self,
+        queryset: QuerySet,
+        pagination: Input,
+        request=None,
+        **params: DictStrAny,
+    ) -> Any:
+        assert request, "request is required"
+        total = estimate_count(queryset) if pagination.include_total else None
+
+        queryset = queryset.order_by(*self.ordering)
+        if pagination.cursor:
+            queryset = queryset.filter(
+                self.after(self.decode_cursor(queryset, pagination.cursor)))
+
+        items = list(queryset[:pagination.page_size + 1])
+        has_next = len(items) > pagination.page_size
+        items = items[:pagination.page_size]
+
+        next_cursor = self.encode_cursor(items[-1]) if has_next else None
+        next_url = None
+        if next_cursor:
+            next_url = replace_query_param(
+                request.build_absolute_uri(),
+                self.cursor_query_param,
+                next_cursor,
+            )
+
+        return OrderedDict(
+            [
+                ("next", next_url),
+                ("next_cursor", next_cursor),
+                ("count", total),
+                ("results", items),
+            ]
+        )
@@ -0,0 +1,11 @@
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from core.middlewares.check_mode import publish_mode_flags
+from core.models import Mode
+
+
+@receiver(post_save, sender=Mode)
+def publish_mode_on_save(sender, instance, **kwargs):
+    """Push the new flags to every worker's CheckModeMiddleware"""
+    publish_mode_flags(instance)
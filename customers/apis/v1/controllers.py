@@ -1,23 +1,28 @@
 from datetime import date
 from typing import Optional
 from ninja.files import UploadedFile
+from django.core.exceptions import ValidationError
 from django.db import transaction
+from accounts.apis.v1.authentication import ClaimsJWTAuth
 from accounts.apis.v1.permissions import IsCustomer
 from accounts.models import User, UserOtp
 from core.helpers import encrypt_small
+from core.pagination import CursorPaginatedResponseSchema, KeysetPagination
 from customers.models import Customer, CustomerDiaryEntry, WeightEntry, Reminder
 from customers.constants import (
+    WeightUnisChoices,
     LanguageChoices,
     TimezoneChoices,
     DEFAULT_REMINDER_CHOICES,
 )
-from ninja_extra import api_controller, http_post, http_get, http_patch
+from ninja_extra import api_controller, http_post, http_get, http_patch, paginate
 from ninja import Form, File
 from ninja.errors import HttpError
 
 from general.apis.v1.schemas import SuccessSchema
 from .schemas import (
     CustomerDiaryEntryInOutSchema,
+    CustomerDiaryEntryOutSchema,
     CustomerProfileUpdateOutSchema,
     CustomerProfileUpdateSchema,
     CustomerRegistrationResponseSchema,
@@ -26,6 +31,8 @@ from .schemas import (
     HealthAnalysisResponseSchema,
     ReminderInfoSchema,
     WeightEntryInSchema,
+    WeightEntryListSchema,
+    WeightHistoryOutSchema,
     PreferencesUpdateSchema,
     PreferencesOptionsSchema,
     ReminderSettingsSchema,
@@ -81,7 +88,10 @@ class CustomerOpenAPIController:
 
             # Create customer profile only if it does not exist
             _, _ = Customer.objects.get_or_create(user=user)
-            UserOtp.create_email_otp(user.email)
+            try:
+                UserOtp.create_email_otp(user.email)
+            except ValidationError as e:
+                raise HttpError(400, e.messages[0])
 
         return 200, {
             "detail": {
@@ -203,6 +213,58 @@ class CustomerAPIController:
             },
         }
 
+    @http_get(
+        "weight-entries/",
+        response={
+            200: CursorPaginatedResponseSchema[WeightEntryListSchema],
+        },
+        auth=ClaimsJWTAuth(),
+    )
+    @paginate(KeysetPagination, ordering=('-entry_date', '-id'))
+    def get_weight_entries(self, request):
+        """
+        Get weight entries of the authenticated customer, newest first
+        """
+        return WeightEntry.objects.filter(
+            customer_id=request.user.customer_id, is_deleted=False)
+
+    @http_get(
+        "profile/weight-history/",
+        response={
+            200: WeightHistoryOutSchema,
+        },
+    )
+    def get_weight_history(
+        self,
+        request,
+        unit: str = WeightUnisChoices.KG,
+        points: int = 300,
+        window_days: int = 7,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+    ):
+        """
+        Get the weight trend of the authenticated customer, downsampled
+        to at most `points` points
+        """
+        if unit not in WeightUnisChoices.values:
+            raise HttpError(
+                400, f"unit must be one of {WeightUnisChoices.values}")
+        if points < 10 or points > 2000:
+            raise HttpError(400, "points must be between 10 and 2000")
+        if window_days < 1 or window_days > 365:
+            raise HttpError(400, "window_days must be between 1 and 365")
+
+        user = request.user
+        customer = user.customer
+        return customer.get_weight_history(
+            unit=unit,
+            points=points,
+            window_days=window_days,
+            start_date=start_date,
+            end_date=end_date,
+        )
+
     @http_get(
         "health-analysis/",
         response={
@@ -406,6 +468,21 @@ class CustomerDiaryAPIController:
             }
         }
 
+    @http_get(
+        "entries/",
+        response={
+            200: CursorPaginatedResponseSchema[CustomerDiaryEntryOutSchema],
+        },
+        auth=ClaimsJWTAuth(),
+    )
+    @paginate(KeysetPagination, ordering=('-entry_date', '-id'))
+    def get_diary_entries(self, request):
+        """
+        Get diary entries of the authenticated customer, newest first
+        """
+        return CustomerDiaryEntry.active_objects.filter(
+            customer_id=request.user.customer_id)
+
     @http_get(
         "entry-by-date/",
         response={200: CustomerDiaryEntryInOutSchema},
@@ -5,6 +5,7 @@ from typing import List, Optional, Annotated
 from pydantic import field_validator
 from ninja.files import UploadedFile
 from datetime import date
+from uuid import UUID
 from pydantic import condecimal
 
 from customers.constants import WeightUnisChoices, LanguageChoices, TimezoneChoices
@@ -16,6 +17,13 @@ class WeightEntryOutSchema(Schema):
     unit: str
 
 
+class WeightEntryListSchema(Schema):
+    id: int
+    weight: Decimal
+    unit: Optional[str] = None
+    entry_date: date
+
+
 class CustomerRegistrationSchema(Schema):
     email: EmailStr
     password: str = Field(..., min_length=6)
@@ -118,6 +126,16 @@ class WeightEntryInSchema(Schema):
         return v
 
 
+class WeightHistoryOutSchema(Schema):
+    unit: str
+    total_points: int
+    downsampled: bool
+    dates: List[date]
+    weights: List[float]
+    rolling_average: List[float]
+    trend_per_week: Optional[float] = None
+
+
 class BmiHealthSummaryOutSchema(Schema):
     bmi: float
     notes: List[str]
@@ -136,6 +154,12 @@ class CustomerDiaryEntryInOutSchema(Schema):
     content: str
 
 
+class CustomerDiaryEntryOutSchema(Schema):
+    id: UUID
+    entry_date: date
+    content: str
+
+
 class PreferencesUpdateSchema(Schema):
     language: Optional[str] = None
     timezone: Optional[str] = None
@@ -118,3 +118,76 @@ def bmi_health_summary(weight_kg, height_cm):
         "status": status,
         "status_badge_color": status_badge_color,
     }
+
+
+def rolling_average(days, values, window_days):
+    """
+    Trailing average of `values` over the last `window_days` days for
+    each point. `days` are ascending day numbers of the points.
+    """
+    averages = []
+    total = 0.0
+    start = 0
+    for index, (day, value) in enumerate(zip(days, values)):
+        total += value
+        while days[start] <= day - window_days:
+            total -= values[start]
+            start += 1
+        averages.append(total / (index - start + 1))
+    return averages
+
+
+def linear_slope(xs, ys):
+    """Least-squares slope of ys over xs, or None with fewer than 2 xs"""
+    count = len(xs)
+    if count < 2:
+        return None
+    mean_x = sum(xs) / count
+    mean_y = sum(ys) / count
+    variance = sum((x - mean_x) ** 2 for x in xs)
+    if not variance:
+        return None
+    covariance = sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys))
+    return covariance / variance
+
+
+def lttb_indices(xs, ys, threshold):
+    """
+    Indexes of the points kept by Largest-Triangle-Three-Buckets
+    downsampling to `threshold` points. The first and last points are
+    always kept; every bucket in between keeps the point forming the
+    largest triangle with the previous pick and the next bucket's mean.
+    """
+    count = len(xs)
+    if threshold >= count or threshold < 3:
+        return list(range(count))
+
+    selected = [0]
+    bucket_size = (count - 2) / (threshold - 2)
+    previous = 0
+    for bucket in range(threshold - 2):
+        start = int(bucket * bucket_size) + 1
+        end = int((bucket + 1) * bucket_size) + 1
+
+        next_start = end
+        next_end = min(int((bucket + 2) * bucket_size) + 1, count)
+        if next_start >= next_end:
+            next_start, next_end = count - 1, count
+        next_size = next_end - next_start
+        avg_x = sum(xs[next_start:next_end]) / next_size
+        avg_y = sum(ys[next_start:next_end]) / next_size
+
+        px, py = xs[previous], ys[previous]
+        best, best_area = start, -1.0
+        for index in range(start, end):
+            area = abs(
+                (px - avg_x) * (ys[index] - py)
+                - (px - xs[index]) * (avg_y - py)
+            )
+            if area > best_area:
+                best, best_area = index, area
+        selected.append(best)
+        previous = best
+
+    selected.append(count - 1)
+    return selected
@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+
+from customers.models import Customer
+
+
+class Command(BaseCommand):
+    help = 'Fill the denormalized latest weight and BMI fields on Customer'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Customers fetched per query (default: 500)',
+        )
+
+    def handle(self, *args, **options):
+        customers = Customer.objects.filter(
+            weight_entries__isnull=False).distinct().order_by('pk')
+
+        updated = 0
+        for customer in customers.iterator(chunk_size=options['batch_size']):
+            customer.refresh_latest_weight()
+            updated += 1
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Updated latest weight for {updated} customers'))
@@ -15,7 +15,10 @@ from customers.constants import (
     ReminderTypeChoices,
     get_reminder_details,
 )
-from customers.helpers import bmi_health_summary
+from customers.helpers import (
+    bmi_health_summary, linear_slope, lttb_indices, rolling_average)
+
+LB_TO_KG = 0.453592
 
 
 def get_upload_path(instance, filename):
@@ -58,6 +61,18 @@ class Customer(BaseModel, CrudUrlMixin):
         help_text="User's timezone"
     )
 
+    # Latest weight entry and the BMI summary derived from it, kept in
+    # step with WeightEntry by customers.signals
+    latest_weight = models.DecimalField(
+        max_digits=6, decimal_places=2, blank=True, null=True,
+        editable=False)
+    latest_weight_unit = models.CharField(
+        max_length=100, blank=True, null=True, editable=False,
+        choices=WeightUnisChoices.choices)
+    latest_weight_date = models.DateField(
+        blank=True, null=True, editable=False)
+    bmi_summary = models.JSONField(blank=True, null=True, editable=False)
+
     class Crud:
         url_base_name = "customer"
 
@@ -70,14 +85,42 @@ class Customer(BaseModel, CrudUrlMixin):
 
     @property
     def weight(self):
-        latest = (
-            WeightEntry.objects.filter(customer=self)
+        if self.latest_weight is None:
+            return None
+        return {
+            'weight': normalize_number(self.latest_weight),
+            'unit': self.latest_weight_unit,
+        }
+
+    def save(self, *args, **kwargs):
+        # Height changes invalidate the cached BMI summary
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or 'height' in update_fields:
+            self.bmi_summary = self.calculate_bmi_summary()
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, 'bmi_summary'}
+        super().save(*args, **kwargs)
+
+    def set_latest_weight(self, entry):
+        """
+        Point the denormalized weight fields at a WeightEntry (or None)
+        and save them along with the recomputed BMI summary
+        """
+        self.latest_weight = entry.weight if entry else None
+        self.latest_weight_unit = entry.unit if entry else None
+        self.latest_weight_date = entry.entry_date if entry else None
+        self.bmi_summary = self.calculate_bmi_summary()
+        self.save(update_fields=[
+            'latest_weight', 'latest_weight_unit', 'latest_weight_date',
+            'bmi_summary',
+        ])
+
+    def refresh_latest_weight(self):
+        self.set_latest_weight(
+            self.weight_entries.filter(is_deleted=False)
             .order_by("-entry_date", "-time_stamp")
             .first()
         )
-        return {
-            'weight': normalize_number(
-                latest.weight), 'unit': latest.unit} if latest else None
 
     def get_profile_data(self, request):
 
@@ -97,24 +140,67 @@ class Customer(BaseModel, CrudUrlMixin):
             "timezone": self.timezone,
         }
 
-    def get_bmi_data(self):
-        weight_data = self.weight
-
+    def calculate_bmi_summary(self):
         # Return None if no weight entry exists
-        if not weight_data:
+        if self.latest_weight is None:
             return None
 
-        weight = weight_data['weight']
-        unit = weight_data['unit']
-
-        if unit == WeightUnisChoices.LB:
-            weight = float(weight) * 0.453592  # Convert pounds to kg
+        weight = float(self.latest_weight)
+        if self.latest_weight_unit == WeightUnisChoices.LB:
+            weight = weight * LB_TO_KG  # Convert pounds to kg
 
         height = self.height
         if weight and height:
-            return bmi_health_summary(float(weight), float(height))
+            return bmi_health_summary(weight, float(height))
         return None
 
+    def get_bmi_data(self):
+        return self.bmi_summary
+
+    def get_weight_history(
+        self, unit=WeightUnisChoices.KG, points=300, window_days=7,
+        start_date=None, end_date=None
+    ):
+        """
+        Weight series in one unit with a trailing rolling average and the
+        trend slope per week, downsampled with LTTB to at most `points`
+        points. The average and slope use every entry; only the returned
+        series is downsampled.
+        """
+        entries = self.weight_entries.filter(is_deleted=False)
+        if start_date:
+            entries = entries.filter(entry_date__gte=start_date)
+        if end_date:
+            entries = entries.filter(entry_date__lte=end_date)
+        rows = entries.order_by('entry_date', 'time_stamp').values_list(
+            'entry_date', 'weight', 'unit')
+
+        dates, weights = [], []
+        for entry_date, weight, entry_unit in rows:
+            weight = float(weight)
+            if entry_unit == WeightUnisChoices.LB:
+                weight *= LB_TO_KG
+            if unit == WeightUnisChoices.LB:
+                weight /= LB_TO_KG
+            dates.append(entry_date)
+            weights.append(weight)
+
+        days = [entry_date.toordinal() for entry_date in dates]
+        averages = rolling_average(days, weights, window_days)
+        slope = linear_slope(days, weights)
+        keep = lttb_indices(days, weights, points)
+
+        return {
+            'unit': unit,
+            'total_points': len(dates),
+            'downsampled': len(keep) < len(dates),
+            'dates': [dates[index] for index in keep],
+            'weights': [round(weights[index], 2) for index in keep],
+            'rolling_average': [round(averages[index], 2) for index in keep],
+            'trend_per_week': (
+                round(slope * 7, 3) if slope is not None else None),
+        }
+
 
 class WeightEntry(RelatedModal):
     customer = models.ForeignKey(
@@ -126,6 +212,7 @@ class WeightEntry(RelatedModal):
     unit = models.CharField(
         max_length=100, blank=True, null=True,
         choices=WeightUnisChoices.choices)
+    updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return "{} - {} kg on {}".format(
@@ -136,6 +223,10 @@ class WeightEntry(RelatedModal):
 
     class Meta:
         ordering = ['-entry_date', '-time_stamp']
+        indexes = [
+            models.Index(fields=['customer', 'updated_at']),
+            models.Index(fields=['customer', 'entry_date', 'time_stamp']),
+        ]
 
 
 class CustomerDiaryEntry(BaseModel):
@@ -153,6 +244,10 @@ class CustomerDiaryEntry(BaseModel):
 
     class Meta:
         ordering = ['-entry_date']
+        indexes = [
+            models.Index(fields=['customer', 'updated_at']),
+            models.Index(fields=['customer', 'entry_date']),
+        ]
 
 
 class Reminder(BaseModel):
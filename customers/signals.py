@@ -0,0 +1,32 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from accounts.models import User
+from customers.models import Customer, WeightEntry
+
+
+def _is_newest(customer, entry):
+    latest = customer.latest_weight_date
+    return latest is None or entry.entry_date >= latest
+
+
+@receiver(post_save, sender=WeightEntry)
+def update_latest_weight(sender, instance, created, raw=False, **kwargs):
+    """Keep Customer.latest_weight on the newest live weight entry"""
+    if raw:
+        return
+    customer = instance.customer
+    if created and not instance.is_deleted and _is_newest(customer, instance):
+        # A new entry on or after the latest date is the latest one
+        customer.set_latest_weight(instance)
+    else:
+        customer.refresh_latest_weight()
+
+
+@receiver(post_delete, sender=WeightEntry)
+def remove_latest_weight(sender, instance, origin=None, **kwargs):
+    # Entries removed along with their user/customer need no update
+    origin_model = getattr(origin, 'model', type(origin))
+    if issubclass(origin_model, (User, Customer)):
+        return
+    instance.customer.refresh_latest_weight()
@@ -1,5 +1,7 @@
+from .async_controllers import AsyncGeneralAPIController
 from .controllers import (
     GeneralAPIController)
 
 # This list makes it easy for the central API to find them
 register_controllers = [GeneralAPIController]
+register_async_controllers = [AsyncGeneralAPIController]
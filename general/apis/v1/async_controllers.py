@@ -0,0 +1,34 @@
+from ninja.errors import HttpError
+from ninja_extra import api_controller, http_get
+from django.utils import timezone
+
+from general.apis.v1.schemas import DailyTipSchema
+from general.models import DailyTip
+
+
+@api_controller('general/', tags=['General'])
+class AsyncGeneralAPIController:
+    """
+    Async read endpoints for general app content
+    """
+
+    @http_get(
+        'daily-tips/',
+        response={200: DailyTipSchema,
+                  404: dict},
+    )
+    async def daily_tips(self, request):
+        """
+        Get today's daily tip for women's health and wellness
+        """
+        today = timezone.now().date()
+
+        try:
+            daily_tip = await DailyTip.objects.aget(date=today)
+            return {
+                "date": daily_tip.date,
+                "short_description": daily_tip.short_description,
+                "long_description": daily_tip.long_description,
+            }
+        except DailyTip.DoesNotExist:
+            raise HttpError(404, "No daily tip available for today. Please run 'python manage.py populate_daily_tips' to generate tips.")
@@ -3,3 +3,6 @@ from django.apps import AppConfig
 
 class GeneralConfig(AppConfig):
     name = 'general'
+
+    def ready(self):
+        import general.signals as _  # noqa
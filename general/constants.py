@@ -15,3 +15,8 @@ class OSTypeEnum(str, Enum):
 class LanguageChoice(models.TextChoices):
     ENGLISH = 'en', 'English'
     MALAYALAM = 'ml', 'Malayalam'
+
+
+class AverageWindow(models.TextChoices):
+    COUNT = 'count', 'Most recent cycles'
+    MONTHS = 'months', 'Recent months'
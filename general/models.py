@@ -1,7 +1,11 @@
+import time
+
+from django.core.cache import cache
+from django.core.validators import MaxValueValidator, MinValueValidator
 from django.db import models
 
 from core.models import BaseModel
-from general.constants import LanguageChoice, OSType
+from general.constants import AverageWindow, LanguageChoice, OSType
 
 
 class AppVersion(models.Model):
@@ -18,12 +22,53 @@ class AppVersion(models.Model):
         return f"Version {self.version} released on {self.release_date}"
 
 
+# AppAdminSettings is served from a process-local copy refreshed every
+# APP_SETTINGS_LOCAL_TTL seconds from the cache backend. Saving or
+# deleting the settings drops both in the process that made the change
+# (see general.signals). The cache backend may be per process as well
+# (LocMemCache), so its entry lives no longer than the local copy and
+# other workers see a change within 2 * APP_SETTINGS_LOCAL_TTL seconds.
+APP_SETTINGS_CACHE_KEY = "general:app-admin-settings"
+APP_SETTINGS_LOCAL_TTL = 30
+APP_SETTINGS_CACHE_TIMEOUT = APP_SETTINGS_LOCAL_TTL
+
+_local_settings = {"settings": None, "expires_at": 0}
+
+
 class AppAdminSettings(models.Model):
     no_avg_period_months = models.PositiveIntegerField(
         default=6,
         help_text=("Number of months to consider for average period "
                    "calculations")
     )
+    periods_for_average = models.PositiveIntegerField(
+        default=3,
+        validators=[MinValueValidator(1), MaxValueValidator(24)],
+        help_text=("Number of most recent cycles to average for cycle and "
+                   "period length (at most 24)")
+    )
+    average_window = models.CharField(
+        max_length=10,
+        choices=AverageWindow.choices,
+        default=AverageWindow.COUNT,
+        help_text=("Average over the most recent periods_for_average cycles "
+                   "or over the cycles of the last no_avg_period_months "
+                   "months (at most 24 cycles)")
+    )
+    cycle_outlier_stddev = models.FloatField(
+        null=True,
+        blank=True,
+        validators=[MinValueValidator(1)],
+        help_text=("Drop cycles more than this many standard deviations "
+                   "from the mean before averaging, e.g. 2. Leave empty "
+                   "to keep every cycle")
+    )
+    recency_weight_decay = models.FloatField(
+        default=1,
+        validators=[MinValueValidator(0.1), MaxValueValidator(1)],
+        help_text=("Weight of each cycle relative to the next newer one; "
+                   "1 weights all cycles equally")
+    )
 
     def __str__(self):
         return "App Admin Settings"
@@ -33,6 +78,34 @@ class AppAdminSettings(models.Model):
         settings = cls.objects.first()
         return settings if settings else cls.objects.create()
 
+    @classmethod
+    def get_cached(cls) -> "AppAdminSettings":
+        """
+        Return the settings without touching the database on the hot path.
+        May be up to 2 * APP_SETTINGS_LOCAL_TTL seconds old when another
+        process changed them.
+        """
+        now = time.monotonic()
+        settings = _local_settings["settings"]
+        if settings is not None and now < _local_settings["expires_at"]:
+            return settings
+
+        settings = cache.get(APP_SETTINGS_CACHE_KEY)
+        if settings is None:
+            settings = cls.get_settings()
+            cache.set(
+                APP_SETTINGS_CACHE_KEY, settings, APP_SETTINGS_CACHE_TIMEOUT)
+
+        _local_settings["settings"] = settings
+        _local_settings["expires_at"] = now + APP_SETTINGS_LOCAL_TTL
+        return settings
+
+    @classmethod
+    def invalidate_cache(cls):
+        cache.delete(APP_SETTINGS_CACHE_KEY)
+        _local_settings["settings"] = None
+        _local_settings["expires_at"] = 0
+
 
 class DailyTip(BaseModel):
     date = models.DateField(unique=True)
@@ -0,0 +1,28 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from general.models import AppAdminSettings
+from periods.services import refresh_cycle_stats
+
+
+@receiver(post_save, sender=AppAdminSettings)
+@receiver(post_delete, sender=AppAdminSettings)
+def invalidate_app_settings(sender, **kwargs):
+    """
+    Drop the cached settings of this process and of the cache backend.
+    Other workers pick the change up when their copies expire, see
+    APP_SETTINGS_LOCAL_TTL.
+    """
+    AppAdminSettings.invalidate_cache()
+
+
+@receiver(post_save, sender=AppAdminSettings)
+def refresh_period_profiles(sender, raw=False, **kwargs):
+    """
+    Recompute the stored cycle statistics with the new averaging settings
+    once the change is committed
+    """
+    if raw:
+        return
+    transaction.on_commit(refresh_cycle_stats)
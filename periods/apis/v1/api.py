@@ -1,4 +1,6 @@
+from .async_controllers import AsyncPeriodAPIController
 from .controllers import (PeriodAPIController)
 
 # This list makes it easy for the central API to find them
 register_controllers = [PeriodAPIController]
+register_async_controllers = [AsyncPeriodAPIController]
@@ -0,0 +1,21 @@
+from accounts.apis.v1.permissions import AsyncIsCustomer
+from ninja_extra import api_controller, route
+from ninja.errors import HttpError
+from periods.cache import aget_cached_customer_data
+from .schemas import CurrentPeriodSchema
+
+
+@api_controller("period/", tags=["Period"], permissions=[AsyncIsCustomer])
+class AsyncPeriodAPIController:
+
+    @route.get(
+        "customer-data/",
+        response={200: CurrentPeriodSchema, },
+    )
+    async def get_customer_data(self, request):
+        user = request.user
+        customer = user.customer
+        data = await aget_cached_customer_data(customer)
+        if data is None:
+            raise HttpError(404, "No period profile found for customer")
+        return data
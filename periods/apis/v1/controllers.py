@@ -1,13 +1,19 @@
+from accounts.apis.v1.authentication import ClaimsJWTAuth
 from accounts.apis.v1.permissions import IsCustomer
 from ninja_extra import api_controller, http_get, http_post, http_put, paginate, route
-from ninja.errors import HttpError
 from ninja_extra.pagination import PageNumberPaginationExtra, PaginatedResponseSchema
+from ninja.errors import HttpError
+from core.pagination import CursorPaginatedResponseSchema, KeysetPagination
 from periods.models import Period
-from periods.services import get_current_period_status
+from periods.cache import get_cached_customer_data, get_cached_forecast
+from periods.services import bulk_import_periods
 from datetime import datetime, timedelta
 from django.utils import timezone
 from .schemas import (
     CurrentPeriodSchema,
+    CycleForecastSchema,
+    PeriodBulkImportOutSchema,
+    PeriodBulkImportSchema,
     PeriodDetailedOutSchema,
     PeriodInSchema,
     PeriodOutSchema,
@@ -53,6 +59,18 @@ class PeriodAPIController:
         )
         return period_entry
 
+    @http_post(
+        "bulk-import/",
+        response={200: PeriodBulkImportOutSchema},
+    )
+    def import_periods(self, request, data: PeriodBulkImportSchema):
+        """
+        Import historical period entries for the authenticated customer
+        """
+        user = request.user
+        customer = user.customer
+        return bulk_import_periods(customer, data.periods, user=user)
+
     @http_post(
         "end/",
         response={200: PeriodOutSchema},
@@ -87,17 +105,30 @@ class PeriodAPIController:
     @route.get(
         "list/",
         response={200: PaginatedResponseSchema[PeriodDetailedOutSchema]},
+        auth=ClaimsJWTAuth(),
     )
     @paginate(PageNumberPaginationExtra, page_size=1)
     def get_period_list(self, request):
         """
         Get a list of all period entries for the authenticated customer
         """
-        user = request.user
-        customer = user.customer
+        period_list = Period.objects.filter(
+            customer_id=request.user.customer_id).order_by('-start_date')
+        return period_list
 
+    @route.get(
+        "list/cursor/",
+        response={200: CursorPaginatedResponseSchema[PeriodDetailedOutSchema]},
+        auth=ClaimsJWTAuth(),
+    )
+    @paginate(KeysetPagination, ordering=('-start_date', '-id'), page_size=10)
+    def get_period_cursor_list(self, request):
+        """
+        Get the period entries of the authenticated customer with cursor
+        pagination, newest first. Pages cost the same however deep they go.
+        """
         period_list = Period.objects.filter(
-            customer=customer).order_by('-start_date')
+            customer_id=request.user.customer_id)
         return period_list
 
     @route.get(
@@ -107,9 +138,30 @@ class PeriodAPIController:
     def get_customer_data(self, request):
         user = request.user
         customer = user.customer
-        # profile = PeriodProfile.objects.filter(customer=customer).first()
-        if hasattr(customer, 'period_profile'):
-            profile = customer.period_profile
-        else:
+        data = get_cached_customer_data(customer)
+        if data is None:
+            raise HttpError(404, "No period profile found for customer")
+        return data
+
+
+    @route.get(
+        "forecast/",
+        response={200: CycleForecastSchema},
+    )
+    def get_forecast(self, request, months: int = 6):
+        """
+        Get predicted period, fertile window and ovulation ranges for the
+        next N months
+        """
+        if months < 1 or months > 24:
+            raise HttpError(400, "months must be between 1 and 24")
+
+        user = request.user
+        customer = user.customer
+        if not hasattr(customer, 'period_profile'):
             raise HttpError(404, "No period profile found for customer")
-        return get_current_period_status(profile)
+
+        forecast = get_cached_forecast(customer.period_profile, months)
+        if forecast is None:
+            raise HttpError(404, "Not enough period data for a forecast")
+        return forecast
@@ -2,6 +2,7 @@ from datetime import datetime, date
 from uuid import UUID
 from ninja import Schema
 from ninja import ModelSchema
+from pydantic import Field, model_validator
 
 from periods.models import Period
 
@@ -17,6 +18,27 @@ class PeriodInSchema(Schema):
     end_date: datetime
 
 
+class PeriodImportItemSchema(Schema):
+    start_date: datetime
+    end_date: datetime
+
+    @model_validator(mode='after')
+    def validate_dates(self):
+        if self.end_date < self.start_date:
+            raise ValueError('end_date must be after start_date')
+        return self
+
+
+class PeriodBulkImportSchema(Schema):
+    periods: list[PeriodImportItemSchema] = Field(
+        ..., min_length=1, max_length=5000)
+
+
+class PeriodBulkImportOutSchema(Schema):
+    created: int
+    skipped: int
+
+
 class PeriodStartSchema(Schema):
     start_date: date
     end_date: date | None = None
@@ -53,3 +75,15 @@ class CurrentPeriodSchema(Schema):
     card_value: str  # e.g., "In Progress", "3 Days Late", "5 Days Left"
     card_subtitle: str  # e.g., "Jan 15 - Jan 20, 2026"
     card_button_text: str  # e.g., "End Period", "Start Period"
+
+
+class CycleForecastSchema(Schema):
+    start_date: date
+    end_date: date
+    avg_cycle_length: int
+    avg_period_length: int
+    luteal_phase_length: int
+    # Inclusive [start, end] ranges
+    periods: list[list[date]]
+    fertile_windows: list[list[date]]
+    ovulation_dates: list[date]
@@ -0,0 +1,178 @@
+"""
+Per-customer cache for the customer-data dashboard payload.
+
+Entries are keyed by customer, PeriodProfile.version and the customer's
+local date. Every period write saves the profile and bumps its version, so
+a change made by any worker leads every worker to a new key, and entries
+roll over at local midnight. Nothing has to be invalidated, which keeps
+the cache correct on per-process backends such as LocMemCache.
+"""
+from datetime import datetime, time, timedelta
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.utils.timezone import now
+
+from periods.models import PeriodProfile
+from periods.services import forecast_cycles, get_current_period_status
+
+CUSTOMER_DATA_KEY = (
+    "period:customer-data:{customer_id}:{version}:{local_date}")
+FORECAST_KEY = (
+    "period:forecast:{profile_id}:{version}:{local_date}:{months}")
+FORECAST_TIMEOUT = 60 * 60 * 24
+CUSTOMER_DATA_HITS_KEY = "period:customer-data:hits"
+CUSTOMER_DATA_MISSES_KEY = "period:customer-data:misses"
+
+
+def get_local_now(customer):
+    """Current time in the customer's timezone (UTC if unknown)"""
+    try:
+        tz = ZoneInfo(customer.timezone)
+    except (ZoneInfoNotFoundError, ValueError):
+        tz = ZoneInfo("UTC")
+    return now().astimezone(tz)
+
+
+def _cache_key(customer_id, profile, local_date):
+    return CUSTOMER_DATA_KEY.format(
+        customer_id=customer_id,
+        version=profile.version,
+        local_date=local_date.isoformat())
+
+
+def _loaded_profile(customer):
+    """
+    (loaded, profile): the period profile if it came preloaded with the
+    customer, e.g. through the request principal
+    """
+    if type(customer).period_profile.is_cached(customer):
+        return True, getattr(customer, 'period_profile', None)
+    return False, None
+
+
+def _incr(key):
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, 0, timeout=None)
+        cache.incr(key)
+
+
+async def _aincr(key):
+    try:
+        await cache.aincr(key)
+    except ValueError:
+        await cache.aadd(key, 0, timeout=None)
+        await cache.aincr(key)
+
+
+def _serialize_period(period):
+    if period is None:
+        return None
+    return {
+        'id': period.id,
+        'start_date': period.start_date,
+        'end_date': period.end_date,
+        'cycle_length': period.cycle_length,
+    }
+
+
+def _build_customer_data(customer, profile, local_now, key):
+    _incr(CUSTOMER_DATA_MISSES_KEY)
+    profile.customer = customer
+
+    data = get_current_period_status(profile, today=local_now.date())
+    data['active_period'] = _serialize_period(data['active_period'])
+
+    # Keep the entry until local midnight at the latest
+    midnight = datetime.combine(
+        local_now.date() + timedelta(days=1), time.min,
+        tzinfo=local_now.tzinfo)
+    timeout = max(int((midnight - local_now).total_seconds()), 1)
+    cache.set(key, data, timeout)
+    return data
+
+
+def get_cached_customer_data(customer):
+    """
+    Return the customer-data payload for the customer's local date and
+    profile version, building and caching it on a miss. Returns None when
+    the customer has no period profile.
+    """
+    loaded, profile = _loaded_profile(customer)
+    if not loaded:
+        profile = PeriodProfile.objects.filter(customer=customer).first()
+    if profile is None:
+        return None
+
+    local_now = get_local_now(customer)
+    key = _cache_key(customer.id, profile, local_now.date())
+
+    data = cache.get(key)
+    if data is not None:
+        _incr(CUSTOMER_DATA_HITS_KEY)
+        return data
+    return _build_customer_data(customer, profile, local_now, key)
+
+
+async def aget_cached_customer_data(customer):
+    """
+    Async get_cached_customer_data. Hits are served from the cache without
+    leaving the event loop; a miss builds the payload in a worker thread.
+    """
+    loaded, profile = _loaded_profile(customer)
+    if not loaded:
+        profile = await PeriodProfile.objects.filter(
+            customer=customer).afirst()
+    if profile is None:
+        return None
+
+    local_now = get_local_now(customer)
+    key = _cache_key(customer.id, profile, local_now.date())
+
+    data = await cache.aget(key)
+    if data is not None:
+        await _aincr(CUSTOMER_DATA_HITS_KEY)
+        return data
+    return await sync_to_async(_build_customer_data)(
+        customer, profile, local_now, key)
+
+
+def get_cached_forecast(profile, months):
+    """
+    Return the cycle forecast for the profile, cached per profile version.
+    Every change to the profile or its periods bumps the version (see
+    PeriodProfile.version), including edits of the last period's dates
+    that keep its id, so a change simply produces a new key and needs no
+    invalidation.
+    """
+    local_date = get_local_now(profile.customer).date()
+    key = FORECAST_KEY.format(
+        profile_id=profile.pk,
+        version=profile.version,
+        local_date=local_date.isoformat(),
+        months=months,
+    )
+
+    data = cache.get(key)
+    if data is None:
+        data = forecast_cycles(profile, months, today=local_date)
+        cache.set(key, data, FORECAST_TIMEOUT)
+    return data
+
+
+def get_customer_data_cache_stats():
+    hits = cache.get(CUSTOMER_DATA_HITS_KEY) or 0
+    misses = cache.get(CUSTOMER_DATA_MISSES_KEY) or 0
+    total = hits + misses
+    return {
+        'hits': hits,
+        'misses': misses,
+        'hit_ratio': round(hits / total, 4) if total else 0,
+    }
+
+
+def reset_customer_data_cache_stats():
+    cache.delete_many([CUSTOMER_DATA_HITS_KEY, CUSTOMER_DATA_MISSES_KEY])
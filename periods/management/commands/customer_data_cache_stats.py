@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+
+from periods.cache import (
+    get_customer_data_cache_stats, reset_customer_data_cache_stats)
+
+
+class Command(BaseCommand):
+    help = 'Show hit/miss counters of the customer-data dashboard cache'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--reset',
+            action='store_true',
+            help='Reset the counters after printing them',
+        )
+
+    def handle(self, *args, **options):
+        stats = get_customer_data_cache_stats()
+        self.stdout.write(
+            f"Hits: {stats['hits']}  Misses: {stats['misses']}  "
+            f"Hit ratio: {stats['hit_ratio']:.2%}"
+        )
+
+        if options['reset']:
+            reset_customer_data_cache_stats()
+            self.stdout.write(self.style.SUCCESS('Counters reset'))
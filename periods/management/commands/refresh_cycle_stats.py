@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from periods.services import refresh_cycle_stats
+
+
+class Command(BaseCommand):
+    help = (
+        'Recompute the cycle statistics of every PeriodProfile from its '
+        'stored stats window with the current AppAdminSettings'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Profiles written per UPDATE statement (default: 500)',
+        )
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be >= 1')
+
+        updated = refresh_cycle_stats(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Refreshed cycle statistics of {updated} period profiles'))
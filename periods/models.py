@@ -1,13 +1,22 @@
+import math
+from dataclasses import dataclass
+
 from django.utils.timezone import now
 
 from django.db import models
-from datetime import timedelta
-from django.utils import timezone
+from datetime import date, timedelta
 from django.core.validators import MinValueValidator, MaxValueValidator
 
 
 from core.models import BaseModel
 
+# Shortest cycle used for predictions, stored lengths below it (or 0) are
+# clamped
+MIN_CYCLE_LENGTH = 21
+# Regularity is judged on this many most recent cycles, independent of the
+# averaging window configured in AppAdminSettings
+REGULARITY_WINDOW = 6
+
 
 class PeriodProfile(models.Model):
     customer = models.OneToOneField(
@@ -51,162 +60,250 @@ class PeriodProfile(models.Model):
         help_text="Standard deviation of cycle lengths"
     )
 
+    # Incremental cycle statistics (maintained by periods.services)
+    stats_ready = models.BooleanField(default=False, editable=False)
+    stats_window = models.JSONField(
+        default=list,
+        blank=True,
+        editable=False,
+        help_text="Most recent periods, newest first"
+    )
+    total_periods = models.PositiveIntegerField(default=0, editable=False)
+
+    # Statistics of the cycles in the averaging window
+    cycle_count = models.PositiveIntegerField(default=0, editable=False)
+    cycle_length_min = models.PositiveIntegerField(
+        null=True, blank=True, editable=False)
+    cycle_length_max = models.PositiveIntegerField(
+        null=True, blank=True, editable=False)
+    cycle_length_mean = models.FloatField(
+        null=True, blank=True, editable=False,
+        help_text="Trimmed and weighted mean cycle length")
+    period_length_mean = models.FloatField(
+        null=True, blank=True, editable=False,
+        help_text="Trimmed and weighted mean period length")
+
+    # Bumped on every save, so caches keyed on it never serve an old
+    # profile, whichever process made the change
+    version = models.PositiveIntegerField(default=0, editable=False)
+
     def __str__(self):
         return f"{self.customer} Period Profile"
 
+    def save(self, *args, **kwargs):
+        self.version += 1
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            kwargs['update_fields'] = {*update_fields, 'version'}
+        super().save(*args, **kwargs)
+
+    @property
+    def prediction_cycle_length(self):
+        return max(self.avg_cycle_length or 0, MIN_CYCLE_LENGTH)
+
     @property
     def follicular_phase_length(self):
         return self.avg_cycle_length - self.luteal_phase_length
 
     def get_cycle_regularity(self):
-        """Calculate if cycles are regular based on last 6 cycles"""
-        from django.db.models import StdDev
-
-        recent_periods = Period.objects.filter(
-            customer=self.customer,
-            cycle_length__isnull=False
-        ).order_by('-start_date')[:6]
-
-        if recent_periods.count() < 3:
+        """
+        Calculate if cycles are regular based on the last
+        REGULARITY_WINDOW cycles of the stats window
+        """
+        lengths = [
+            entry['cycle_length'] for entry in self.stats_window
+            if entry['cycle_length'] is not None
+        ][:REGULARITY_WINDOW]
+        if len(lengths) < 3:
             return 'unknown', None
 
-        variance = recent_periods.aggregate(
-            stddev=StdDev('cycle_length')
-        )['stddev']
-
-        if variance is None:
-            return 'unknown', None
+        mean = sum(lengths) / len(lengths)
+        variance = math.sqrt(
+            sum((length - mean) ** 2 for length in lengths) / len(lengths))
 
         # Regular if standard deviation is less than 3 days
         regularity = 'regular' if variance < 3 else 'irregular'
         return regularity, round(variance, 2)
 
+    def get_prediction(self, today=None):
+        """
+        Return the CyclePrediction snapshot for the given day (default:
+        today). The snapshot is memoized on the instance per date and cycle
+        inputs, so repeated reads within a request reuse the same dates.
+        """
+        if today is None:
+            today = now().date()
+
+        key = (
+            today,
+            self.last_period_id,
+            self.avg_cycle_length,
+            self.avg_period_length,
+            self.luteal_phase_length,
+        )
+        cached = getattr(self, '_prediction', None)
+        if cached is None or cached[0] != key:
+            cached = (key, CyclePrediction.from_profile(self, today))
+            self._prediction = cached
+        return cached[1]
+
     @property
     def next_period_start_date(self):
         """Predict next period start date based on last period and cycle length"""
-        if not self.last_period:
-            return None
-        return self.last_period.start_date.date() + timedelta(days=self.avg_cycle_length)
+        return self.get_prediction().next_period_start_date
 
     @property
     def next_period_end_date(self):
         """Predict next period end date"""
-        if not self.next_period_start_date:
-            return None
-        return self.next_period_start_date + timedelta(days=self.avg_period_length - 1)
+        return self.get_prediction().next_period_end_date
 
     @property
     def ovulation_date(self):
         """Predict ovulation date (typically luteal_phase_length days before next period)"""
-        if not self.next_period_start_date:
-            return None
-        return self.next_period_start_date - timedelta(days=self.luteal_phase_length)
+        return self.get_prediction().ovulation_date
 
     def get_late_period_days(self):
         """Return number of days period is late, or None/0 if not late"""
-        if not self.next_period_start_date:
-            return None
-        days = (now().date() - self.next_period_start_date).days
-        # Only return positive values (period is late)
-        return days if days > 0 else None
+        return self.get_prediction().late_period_days
 
     @property
     def current_cycle_day(self):
         """Return current day of the cycle (1-based)"""
-        if not self.last_period:
-            return None
-        days_since_start = (now().date() - self.last_period.start_date.date()).days
-        return days_since_start + 1
+        return self.get_prediction().current_cycle_day
 
     @property
     def days_until_next_period(self):
         """Return days until next predicted period"""
-        if not self.next_period_start_date:
-            return None
-        days = (self.next_period_start_date - now().date()).days
-        return days if days > 0 else 0
+        return self.get_prediction().days_until_next_period
 
     @property
     def current_phase(self):
         """
         Return current cycle phase: 'menstrual', 'follicular', 'ovulation', 'luteal'
         """
-        if not self.last_period or not self.ovulation_date:
-            return None
+        return self.get_prediction().current_phase
+
+    @property
+    def fertile_window_start(self):
+        return self.get_prediction().fertile_window_start
+
+    @property
+    def fertile_window_end(self):
+        return self.get_prediction().fertile_window_end
+
+    @property
+    def is_fertile_today(self):
+        return self.get_prediction().is_fertile
+
+    @property
+    def pregnancy_chance_today(self):
+        """
+        Calculate pregnancy chance for today based on cycle phase.
+        Returns: 'high', 'medium', or 'low'
+        """
+        return self.get_prediction().pregnancy_chance
+
+
+@dataclass(frozen=True, slots=True)
+class CyclePrediction:
+    """
+    Immutable snapshot of a profile's cycle predictions for one day.
+    Every date is derived once from last_period and the cycle lengths, and
+    `today` is pinned at creation so readers stay consistent even if the
+    request crosses midnight.
+    """
+    today: date
+    next_period_start_date: date | None = None
+    next_period_end_date: date | None = None
+    ovulation_date: date | None = None
+    fertile_window_start: date | None = None
+    fertile_window_end: date | None = None
+    current_cycle_day: int | None = None
+    days_until_next_period: int | None = None
+    late_period_days: int | None = None
+    current_phase: str | None = None
+    is_fertile: bool = False
+    pregnancy_chance: str = 'low'
 
-        today = now().date()
-        last_period_end = self.last_period.end_date.date()
+    @classmethod
+    def from_profile(cls, profile, today):
+        last_period = profile.last_period
+        if not last_period:
+            return cls(today=today)
+
+        period_start = last_period.start_date.date()
+        period_end = last_period.end_date.date()
+
+        next_start = period_start + timedelta(
+            days=profile.prediction_cycle_length)
+        next_end = next_start + timedelta(days=profile.avg_period_length - 1)
+        ovulation = next_start - timedelta(days=profile.luteal_phase_length)
+        fertile_start = ovulation - timedelta(days=5)
+        fertile_end = ovulation + timedelta(days=1)
+
+        late_days = (today - next_start).days
+        is_fertile = fertile_start <= today <= fertile_end
+
+        return cls(
+            today=today,
+            next_period_start_date=next_start,
+            next_period_end_date=next_end,
+            ovulation_date=ovulation,
+            fertile_window_start=fertile_start,
+            fertile_window_end=fertile_end,
+            current_cycle_day=(today - period_start).days + 1,
+            days_until_next_period=max((next_start - today).days, 0),
+            # Only positive values (period is late)
+            late_period_days=late_days if late_days > 0 else None,
+            current_phase=cls._get_phase(
+                today, period_start, period_end, ovulation, next_start),
+            is_fertile=is_fertile,
+            pregnancy_chance=cls._get_pregnancy_chance(
+                today, ovulation, fertile_start, fertile_end, is_fertile),
+        )
 
+    @staticmethod
+    def _get_phase(today, period_start, period_end, ovulation, next_start):
         # Menstrual phase: during period
-        if self.last_period.start_date.date() <= today <= last_period_end:
+        if period_start <= today <= period_end:
             return 'menstrual'
 
         # Ovulation phase: day of ovulation ± 1 day
-        ovulation_start = self.ovulation_date - timedelta(days=1)
-        ovulation_end = self.ovulation_date + timedelta(days=1)
+        ovulation_start = ovulation - timedelta(days=1)
+        ovulation_end = ovulation + timedelta(days=1)
         if ovulation_start <= today <= ovulation_end:
             return 'ovulation'
 
         # Luteal phase: after ovulation until next period
-        if self.ovulation_date < today < self.next_period_start_date:
+        if ovulation < today < next_start:
             return 'luteal'
 
         # Follicular phase: after period ends until ovulation
-        if last_period_end < today < self.ovulation_date:
+        if period_end < today < ovulation:
             return 'follicular'
 
         # If past next predicted period, still in luteal (cycle may be longer)
-        if today >= self.next_period_start_date:
+        if today >= next_start:
             return 'luteal'
 
         return None
 
-    @property
-    def fertile_window_start(self):
-        if not self.ovulation_date:
-            return None
-        return self.ovulation_date - timedelta(days=5)
-
-    @property
-    def fertile_window_end(self):
-        if not self.ovulation_date:
-            return None
-        return self.ovulation_date + timedelta(days=1)
-
-    @property
-    def is_fertile_today(self):
-        if not self.fertile_window_start or not self.fertile_window_end:
-            return False
-        today = timezone.now().date()
-        return (
-            self.fertile_window_start <= today <= self.fertile_window_end
-        )
-
-    @property
-    def pregnancy_chance_today(self):
-        """
-        Calculate pregnancy chance for today based on cycle phase.
-        Returns: 'high', 'medium', or 'low'
-        """
-        if not self.ovulation_date or not self.fertile_window_start or not self.fertile_window_end:
-            return 'low'
-
-        today = timezone.now().date()
-
+    @staticmethod
+    def _get_pregnancy_chance(
+            today, ovulation, fertile_start, fertile_end, is_fertile):
         # High chance: During fertile window (especially 2 days before ovulation to ovulation day)
-        if self.fertile_window_start <= today <= self.fertile_window_end:
+        if is_fertile:
             # Peak fertility: 2 days before to 1 day after ovulation
-            peak_start = self.ovulation_date - timedelta(days=2)
-            peak_end = self.ovulation_date + timedelta(days=1)
+            peak_start = ovulation - timedelta(days=2)
+            peak_end = ovulation + timedelta(days=1)
             if peak_start <= today <= peak_end:
                 return 'high'
-            else:
-                # Early fertile window (3-5 days before ovulation)
-                return 'medium'
+            # Early fertile window (3-5 days before ovulation)
+            return 'medium'
 
         # Medium chance: 1-2 days outside fertile window
-        medium_window_start = self.fertile_window_start - timedelta(days=2)
-        medium_window_end = self.fertile_window_end + timedelta(days=2)
+        medium_window_start = fertile_start - timedelta(days=2)
+        medium_window_end = fertile_end + timedelta(days=2)
         if medium_window_start <= today <= medium_window_end:
             return 'medium'
 
@@ -227,6 +324,27 @@ class Period(BaseModel):
 
     class Meta:
         ordering = ['-start_date']
+        indexes = [
+            # History, previous-period and latest-period lookups:
+            # customer = ? ORDER BY start_date DESC. Covering on PostgreSQL.
+            models.Index(
+                fields=['customer', '-start_date'],
+                include=['end_date', 'period_length', 'cycle_length'],
+                name='period_customer_start_idx',
+            ),
+            # Active period: customer = ? AND start_date <= now
+            # AND end_date >= now
+            models.Index(
+                fields=['customer', 'start_date', 'end_date'],
+                name='period_customer_range_idx',
+            ),
+            # Cycle statistics only read periods with a cycle length
+            models.Index(
+                fields=['customer', '-start_date'],
+                condition=models.Q(cycle_length__isnull=False),
+                name='period_customer_cycle_idx',
+            ),
+        ]
 
     def __str__(self):
         return "{}".format(
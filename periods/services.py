@@ -1,17 +1,41 @@
-from django.utils.timezone import now
-from django.db.models import Avg
-from .models import Period
+import calendar
+import math
+from datetime import date, timedelta
+
+from django.db import transaction
+from django.utils.timezone import is_naive, make_aware, now
+from .models import Period, PeriodProfile
+from general.constants import AverageWindow
 from general.models import AppAdminSettings
 
+# Number of most recent periods kept on PeriodProfile for cycle statistics
+CYCLE_STATS_WINDOW = 24
+
+CYCLE_STATS_FIELDS = [
+    "last_period",
+    "avg_cycle_length",
+    "avg_period_length",
+    "cycle_regularity",
+    "cycle_variance",
+    "stats_ready",
+    "stats_window",
+    "total_periods",
+    "cycle_count",
+    "cycle_length_min",
+    "cycle_length_max",
+    "cycle_length_mean",
+    "period_length_mean",
+]
+
 
-def calculate_main_card_display(profile, active_period):
+def calculate_main_card_display(prediction, active_period):
     """
-    Calculate main card display data using server time.
+    Calculate main card display data from a CyclePrediction snapshot.
     Returns status, label, value, subtitle, and button text.
     """
 
-    today = now().date()
-    late_days = profile.get_late_period_days()
+    today = prediction.today
+    late_days = prediction.late_period_days
 
     # Period is currently active
     if active_period:
@@ -31,8 +55,8 @@ def calculate_main_card_display(profile, active_period):
         day_word = 'Day' if late_days == 1 else 'Days'
         subtitle = 'Please start your period when it arrives'
 
-        if profile.next_period_start_date:
-            expected = profile.next_period_start_date.strftime('%b %d, %Y')
+        if prediction.next_period_start_date:
+            expected = prediction.next_period_start_date.strftime('%b %d, %Y')
             subtitle = f"Expected: {expected}"
 
         return {
@@ -44,9 +68,9 @@ def calculate_main_card_display(profile, active_period):
         }
 
     # In fertile window
-    if profile.is_fertile_today:
-        fertile_start = profile.fertile_window_start
-        fertile_end = profile.fertile_window_end
+    if prediction.is_fertile:
+        fertile_start = prediction.fertile_window_start
+        fertile_end = prediction.fertile_window_end
 
         if fertile_start and fertile_end:
             start_str = fertile_start.strftime('%b %d')
@@ -70,21 +94,23 @@ def calculate_main_card_display(profile, active_period):
     next_event_date = None
 
     # Check ovulation
-    if profile.ovulation_date and profile.ovulation_date >= today:
-        days_to_ovulation = (profile.ovulation_date - today).days
+    ovulation_date = prediction.ovulation_date
+    if ovulation_date and ovulation_date >= today:
+        days_to_ovulation = (ovulation_date - today).days
         if days_to_ovulation >= 0:
             next_event_days = days_to_ovulation
             next_event_type = 'Ovulation'
-            next_event_date = profile.ovulation_date
+            next_event_date = ovulation_date
 
     # Check next period
-    if profile.next_period_start_date and profile.next_period_start_date >= today:
-        days_to_period = (profile.next_period_start_date - today).days
+    next_period_date = prediction.next_period_start_date
+    if next_period_date and next_period_date >= today:
+        days_to_period = (next_period_date - today).days
         if days_to_period >= 0:
             if next_event_days is None or days_to_period < next_event_days:
                 next_event_days = days_to_period
                 next_event_type = 'Next Period'
-                next_event_date = profile.next_period_start_date
+                next_event_date = next_period_date
 
     # Format next event
     if next_event_days is not None and next_event_type and next_event_date:
@@ -115,60 +141,392 @@ def calculate_main_card_display(profile, active_period):
     }
 
 
-def calculate_average_cycle_data(customer):
+def _select_cycles(window, settings, today):
     """
-    Calculate average cycle length and period length for a customer
-    based on their historical period data
+    Window entries with a cycle length inside the configured averaging
+    window, newest first
     """
-    # Get the last N periods (configurable, default 3)
-    try:
-        settings = AppAdminSettings.objects.first()
-        periods_to_consider = settings.periods_for_average if settings else 3
-    except Exception:
-        periods_to_consider = 3
+    cycles = [entry for entry in window if entry['cycle_length'] is not None]
+    if settings.average_window == AverageWindow.MONTHS:
+        since = add_months(today, -settings.no_avg_period_months).isoformat()
+        return [entry for entry in cycles if entry['start_date'] >= since]
+    return cycles[:settings.periods_for_average]
+
+
+def _weighted_mean(values, decay):
+    """Mean of newest-first values, the i-th weighted decay ** i"""
+    total = weights = 0
+    for index, value in enumerate(values):
+        if value is None:
+            continue
+        weight = decay ** index
+        total += weight * value
+        weights += weight
+    return total / weights if weights else None
 
-    # Get recent periods with cycle length calculated
-    periods = Period.objects.filter(
-        customer=customer,
-        cycle_length__isnull=False
-    ).order_by('-start_date')[:periods_to_consider]
 
-    if not periods.exists():
+def calculate_cycle_stats(window, settings=None, today=None):
+    """
+    Cycle statistics over the configured averaging window of a profile's
+    stats window.
+
+    Count, min, max and standard deviation of the cycle lengths come from
+    one pass over the window. If outlier trimming is configured, cycles
+    too far from the mean are dropped before the means are taken, and the
+    means are recency weighted when a decay below 1 is set.
+    Returns None when the averaging window holds no cycles.
+    """
+    settings = settings or AppAdminSettings.get_cached()
+    today = today or now().date()
+
+    cycles = _select_cycles(window, settings, today)
+    if not cycles:
         return None
 
-    # Calculate averages
-    avg_cycle = periods.aggregate(avg=Avg('cycle_length'))['avg']
-    avg_period = periods.aggregate(avg=Avg('period_length'))['avg']
+    count = total = sq_total = 0
+    low = high = None
+    for entry in cycles:
+        length = entry['cycle_length']
+        count += 1
+        total += length
+        sq_total += length ** 2
+        low = length if low is None else min(low, length)
+        high = length if high is None else max(high, length)
 
-    if avg_cycle and avg_period:
-        return {
-            'avg_cycle_length': round(avg_cycle),
-            'avg_period_length': round(avg_period),
-        }
+    mean = total / count
+    stddev = math.sqrt(max(sq_total / count - mean ** 2, 0))
+
+    sample = cycles
+    limit = settings.cycle_outlier_stddev
+    if limit and count >= 3 and stddev > 0:
+        sample = [
+            entry for entry in cycles
+            if abs(entry['cycle_length'] - mean) <= limit * stddev
+        ] or cycles
+
+    decay = settings.recency_weight_decay
+    return {
+        'cycle_count': count,
+        'cycle_length_min': low,
+        'cycle_length_max': high,
+        'cycle_variance': round(stddev, 2),
+        'cycle_length_mean': _weighted_mean(
+            [entry['cycle_length'] for entry in sample], decay),
+        'period_length_mean': _weighted_mean(
+            [entry['period_length'] for entry in sample], decay),
+    }
+
+
+def _window_entry(period):
+    return {
+        'id': str(period.pk),
+        'start_date': period.start_date.date().isoformat(),
+        'end_date': period.end_date.date().isoformat(),
+        'cycle_length': period.cycle_length,
+        'period_length': period.period_length,
+    }
+
+
+def _window_key(entry):
+    return entry['start_date'], entry['id']
+
+
+def _compute_cycle_stats(profile):
+    """
+    Derive last_period, averages and regularity from the stats window,
+    without touching the database
+    """
+    window = profile.stats_window
+    stats = calculate_cycle_stats(window) if window else None
+
+    profile.cycle_count = stats['cycle_count'] if stats else 0
+    for field in (
+            'cycle_length_min', 'cycle_length_max',
+            'cycle_length_mean', 'period_length_mean'):
+        setattr(profile, field, stats[field] if stats else None)
+
+    if not window:
+        # No periods left - reset profile to defaults
+        profile.last_period = None
+        profile.avg_cycle_length = 28  # Default
+        profile.avg_period_length = 5  # Default
+    else:
+        # Use the window averages if using average cycle
+        if (profile.use_average_cycle and profile.cycle_length_mean
+                and profile.period_length_mean):
+            profile.avg_cycle_length = round(profile.cycle_length_mean)
+            profile.avg_period_length = round(profile.period_length_mean)
+
+        # If latest period is ongoing, use last completed period for
+        # calculations, otherwise the latest period is the reference
+        today = now().date().isoformat()
+        reference = window[0]
+        if reference['end_date'] > today:
+            completed = [
+                entry for entry in window if entry['end_date'] <= today]
+            if completed:
+                reference = max(completed, key=lambda e: e['end_date'])
+        profile.last_period_id = reference['id']
+
+    regularity, variance = profile.get_cycle_regularity()
+    profile.cycle_regularity = regularity
+    profile.cycle_variance = variance
+
+    profile.stats_ready = True
+
+
+def _apply_cycle_stats(profile):
+    """Recompute the statistics from the stats window and save them"""
+    _compute_cycle_stats(profile)
+    profile.save(update_fields=CYCLE_STATS_FIELDS)
+
+
+def refresh_cycle_stats(batch_size=500):
+    """
+    Recompute the statistics of every profile from its stored stats
+    window, e.g. after AppAdminSettings changed. Reads no periods and
+    writes one UPDATE per batch. Returns the number of profiles updated.
+    """
+    profiles = PeriodProfile.objects.filter(stats_ready=True).order_by('pk')
+    updated = 0
+    batch = []
+    for profile in profiles.iterator(chunk_size=batch_size):
+        _compute_cycle_stats(profile)
+        # bulk_update skips save(), bump the cache version by hand
+        profile.version += 1
+        batch.append(profile)
+        if len(batch) >= batch_size:
+            updated += PeriodProfile.objects.bulk_update(
+                batch, [*CYCLE_STATS_FIELDS, 'version'])
+            batch = []
+    if batch:
+        updated += PeriodProfile.objects.bulk_update(
+            batch, [*CYCLE_STATS_FIELDS, 'version'])
+    return updated
+
+
+def rebuild_cycle_stats(profile):
+    """
+    Full rebuild of the stats window and statistics from the customer's
+    periods. Used when the profile has no stats yet or the window can not
+    be maintained incrementally.
+    """
+    periods = Period.objects.filter(
+        customer_id=profile.customer_id
+    ).order_by('-start_date', '-id')
+
+    profile.total_periods = periods.count()
+    profile.stats_window = [
+        _window_entry(period) for period in periods[:CYCLE_STATS_WINDOW]
+    ]
 
-    return None
+    _apply_cycle_stats(profile)
+    return profile
 
 
-def get_current_period_status(profile):
+def update_cycle_stats(period, created=False, removed=False):
+    """
+    Incrementally update the customer's PeriodProfile for a single period
+    insert, update or delete in O(1), rebuilding only as a fallback.
+    The profile row is locked for the read-modify-write of the window, so
+    concurrent period writes of one customer are applied one at a time.
+    """
+    with transaction.atomic():
+        # One query: the get locks an existing row, a created row is
+        # locked by its insert
+        profile, _ = PeriodProfile.objects.select_for_update().get_or_create(
+            customer_id=period.customer_id)
+        return _update_locked_cycle_stats(profile, period, created, removed)
+
+
+def _update_locked_cycle_stats(profile, period, created, removed):
+    if not profile.stats_ready:
+        return rebuild_cycle_stats(profile)
+
+    window = list(profile.stats_window)
+    # Oldest key still covered by a full window; anything older was
+    # never tracked
+    boundary = (
+        _window_key(window[-1]) if len(window) >= CYCLE_STATS_WINDOW
+        else None)
+
+    key = str(period.pk)
+    for index, entry in enumerate(window):
+        if entry['id'] == key:
+            window.pop(index)
+            break
+
+    if created:
+        profile.total_periods += 1
+    if removed:
+        profile.total_periods = max(profile.total_periods - 1, 0)
+    else:
+        entry = _window_entry(period)
+        if boundary is None or _window_key(entry) >= boundary:
+            window.append(entry)
+            window.sort(key=_window_key, reverse=True)
+            if len(window) > CYCLE_STATS_WINDOW:
+                window.pop()
+
+    profile.stats_window = window
+
+    # A period dropped out of a full window and the next older one is
+    # unknown, fall back to a rebuild
+    if len(window) < min(profile.total_periods, CYCLE_STATS_WINDOW):
+        return rebuild_cycle_stats(profile)
+
+    _apply_cycle_stats(profile)
+    return profile
+
+
+@transaction.atomic
+def bulk_import_periods(customer, periods, user=None):
+    """
+    Import historical periods for a customer in a fixed number of queries.
+
+    The submitted periods are sorted once and merged with the customer's
+    existing periods to compute period_length and cycle_length in memory.
+    Rows are written with bulk_create, so the per-row signals don't fire,
+    and the PeriodProfile is rebuilt once at the end. Periods starting on
+    the same day as an existing one are skipped.
+    """
+    existing = list(
+        Period.objects.filter(customer=customer)
+        .only('id', 'start_date', 'cycle_length')
+        .order_by('start_date')
+    )
+    seen_days = {period.start_date.date() for period in existing}
+
+    def aware(value):
+        return make_aware(value) if is_naive(value) else value
+
+    new_periods = []
+    skipped = 0
+    for item in sorted(periods, key=lambda item: aware(item.start_date)):
+        start_date = aware(item.start_date)
+        end_date = aware(item.end_date)
+        if start_date.date() in seen_days:
+            skipped += 1
+            continue
+        seen_days.add(start_date.date())
+        new_periods.append(Period(
+            customer=customer,
+            creator=user,
+            start_date=start_date,
+            end_date=end_date,
+            period_length=(end_date.date() - start_date.date()).days + 1,
+        ))
+
+    # Single pass over the merged timeline: each period's cycle length is
+    # the gap to the period before it
+    timeline = sorted(
+        existing + new_periods, key=lambda period: period.start_date)
+    changed = []
+    previous = None
+    for period in timeline:
+        if previous is not None:
+            cycle_length = (
+                period.start_date.date() - previous.start_date.date()).days
+            if period._state.adding:
+                period.cycle_length = cycle_length
+            elif previous._state.adding and (
+                    period.cycle_length != cycle_length):
+                # Existing period now preceded by an imported one
+                period.cycle_length = cycle_length
+                changed.append(period)
+        previous = period
+
+    Period.objects.bulk_create(new_periods, batch_size=500)
+    if changed:
+        Period.objects.bulk_update(
+            changed, ['cycle_length'], batch_size=500)
+
+    profile, _ = PeriodProfile.objects.get_or_create(customer=customer)
+    rebuild_cycle_stats(profile)
+
+    return {
+        'created': len(new_periods),
+        'skipped': skipped,
+    }
+
+
+def get_current_period_status(profile, today=None):
     """
     Get the current period status for a customer
     """
 
+    # Pin the day once so every value below comes from the same snapshot
+    prediction = profile.get_prediction(today)
     active_period = Period.get_active_period(profile.customer)
 
     # Calculate main card display data
-    card_data = calculate_main_card_display(profile, active_period)
+    card_data = calculate_main_card_display(prediction, active_period)
 
     return {
         'active_period': active_period,
-        'is_fertile': profile.is_fertile_today,
-        'pregnancy_chance': profile.pregnancy_chance_today,
-        'next_period_date': profile.next_period_start_date,
-        'ovulation_date': profile.ovulation_date,
-        'fertile_window_start': profile.fertile_window_start,
-        'fertile_window_end': profile.fertile_window_end,
+        'is_fertile': prediction.is_fertile,
+        'pregnancy_chance': prediction.pregnancy_chance,
+        'next_period_date': prediction.next_period_start_date,
+        'ovulation_date': prediction.ovulation_date,
+        'fertile_window_start': prediction.fertile_window_start,
+        'fertile_window_end': prediction.fertile_window_end,
         'avg_cycle_length': profile.avg_cycle_length,
         'avg_period_length': profile.avg_period_length,
-        'late_period_days': profile.get_late_period_days(),
+        'late_period_days': prediction.late_period_days,
         **card_data,  # Add card display data
     }
+
+
+def add_months(value, months):
+    """Add calendar months to a date, clamping to the month's last day"""
+    month_index = value.month - 1 + months
+    year = value.year + month_index // 12
+    month = month_index % 12 + 1
+    day = min(value.day, calendar.monthrange(year, month)[1])
+    return date(year, month, day)
+
+
+def forecast_cycles(profile, months, today=None):
+    """
+    Forecast period, fertile window and ovulation ranges for the next
+    `months` months in one computation.
+
+    Every predicted cycle is an arithmetic offset of the next predicted
+    period start, so all ranges are produced from a single range of
+    offsets instead of walking the calendar day by day.
+    """
+    prediction = profile.get_prediction(today)
+    first_start = prediction.next_period_start_date
+    if first_start is None:
+        return None
+
+    end_date = add_months(prediction.today, months)
+    cycle_length = profile.prediction_cycle_length
+    if first_start < prediction.today:
+        # Late period: start from the first predicted start on or after
+        # today, the missed ones are reported by late_period_days
+        missed = -(-(prediction.today - first_start).days // cycle_length)
+        first_start += timedelta(days=missed * cycle_length)
+    period_span = timedelta(days=profile.avg_period_length - 1)
+    luteal = timedelta(days=profile.luteal_phase_length)
+
+    cycles = max((end_date - first_start).days // cycle_length + 1, 0)
+    starts = [
+        first_start + timedelta(days=offset)
+        for offset in range(0, cycles * cycle_length, cycle_length)
+    ]
+    ovulations = [start - luteal for start in starts]
+
+    return {
+        'start_date': prediction.today,
+        'end_date': end_date,
+        'avg_cycle_length': cycle_length,
+        'avg_period_length': profile.avg_period_length,
+        'luteal_phase_length': profile.luteal_phase_length,
+        'periods': [[start, start + period_span] for start in starts],
+        'fertile_windows': [
+            [ovulation - timedelta(days=5), ovulation + timedelta(days=1)]
+            for ovulation in ovulations
+        ],
+        'ovulation_dates': ovulations,
+    }
@@ -1,3 +1,114 @@
+from datetime import timedelta
+from unittest import skipUnless
+
+from django.db import connection
 from django.test import TestCase
+from django.utils.timezone import now
+
+from customers.models import Customer
+from periods.models import Period
+
+PERIOD_INDEXES = {
+    'period_customer_start_idx',
+    'period_customer_range_idx',
+    'period_customer_cycle_idx',
+}
+
+
+class PeriodIndexPlanTests(TestCase):
+    """
+    The Period access paths must be served by the composite and partial
+    indexes in Period.Meta.indexes, not by a table scan or by the plain
+    customer FK index followed by a sort.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        today = now()
+        for _ in range(2):
+            customer = Customer.objects.create()
+            for months in range(12, 0, -1):
+                start = today - timedelta(days=28 * months)
+                Period.objects.create(
+                    customer=customer,
+                    start_date=start,
+                    end_date=start + timedelta(days=4),
+                )
+        cls.customer = customer
+        cls.today = today
+
+    def access_paths(self):
+        """(name, queryset, indexes that may serve it)"""
+        periods = Period.objects.filter(customer=self.customer)
+        return [
+            (
+                'history',
+                periods.order_by('-start_date'),
+                {'period_customer_start_idx', 'period_customer_range_idx'},
+            ),
+            (
+                'previous period',
+                periods.filter(
+                    start_date__lt=self.today).order_by('-start_date')[:1],
+                {'period_customer_start_idx', 'period_customer_range_idx'},
+            ),
+            (
+                'active period',
+                periods.filter(
+                    start_date__lte=self.today, end_date__gte=self.today,
+                ).order_by('-start_date')[:1],
+                {'period_customer_start_idx', 'period_customer_range_idx'},
+            ),
+            (
+                'cycle statistics',
+                periods.filter(
+                    cycle_length__isnull=False).order_by('-start_date'),
+                {'period_customer_cycle_idx'},
+            ),
+        ]
+
+    def explain(self, queryset):
+        sql, params = queryset.query.sql_with_params()
+        prefix = connection.ops.explain_query_prefix()
+        with connection.cursor() as cursor:
+            cursor.execute(f"{prefix} {sql}", params)
+            return "\n".join(
+                " ".join(str(column) for column in row)
+                for row in cursor.fetchall())
+
+    def used_indexes(self, plan):
+        return {name for name in PERIOD_INDEXES if name in plan}
+
+    @skipUnless(connection.vendor == 'sqlite', "SQLite query plans")
+    def test_sqlite_plans_use_period_indexes(self):
+        for name, queryset, expected in self.access_paths():
+            with self.subTest(name):
+                plan = self.explain(queryset)
+                self.assertTrue(self.used_indexes(plan) & expected, plan)
+                self.assertNotIn("TEMP B-TREE FOR ORDER BY", plan)
+
+    @skipUnless(connection.vendor == 'postgresql', "PostgreSQL query plans")
+    def test_postgresql_plans_use_period_indexes(self):
+        with connection.cursor() as cursor:
+            # The test tables are tiny, make the planner show which index
+            # it would pick instead of a sequential scan
+            cursor.execute("SET LOCAL enable_seqscan = off")
+        for name, queryset, expected in self.access_paths():
+            with self.subTest(name):
+                plan = self.explain(queryset)
+                self.assertTrue(self.used_indexes(plan) & expected, plan)
+                self.assertNotIn("Seq Scan", plan)
 
-# Create your tests here.
+    @skipUnless(connection.vendor == 'postgresql', "PostgreSQL query plans")
+    def test_postgresql_history_index_is_covering(self):
+        with connection.cursor() as cursor:
+            # Leave the planner no choice but an index-only scan
+            cursor.execute("SET LOCAL enable_seqscan = off")
+            cursor.execute("SET LOCAL enable_indexscan = off")
+            cursor.execute("SET LOCAL enable_bitmapscan = off")
+        queryset = Period.objects.filter(customer=self.customer).order_by(
+            '-start_date').values(
+                'start_date', 'end_date', 'period_length', 'cycle_length')
+        plan = self.explain(queryset)
+        self.assertIn(
+            "Index Only Scan using period_customer_start_idx", plan)
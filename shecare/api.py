@@ -1,13 +1,24 @@
 from importlib import import_module
 from ninja_extra import NinjaExtraAPI
-from ninja_jwt.authentication import JWTAuth
+from accounts.apis.v1.authentication import (
+    AsyncPrincipalJWTAuth, PrincipalJWTAuth)
 from core.exceptions import ApiError
 
 # Create centralized API instance
 api = NinjaExtraAPI(
     title="SheCare API",
     version="1.0.0",
-    auth=JWTAuth(),
+    auth=PrincipalJWTAuth(),
+)
+
+# Async variants of the read-heavy endpoints, served under api/v1/async/.
+# Only an ASGI deployment lets these share the event loop; under WSGI they
+# still work but each request runs its own loop.
+async_api = NinjaExtraAPI(
+    title="SheCare Async API",
+    version="1.0.0",
+    auth=AsyncPrincipalJWTAuth(),
+    urls_namespace="async_api",
 )
 
 
@@ -23,6 +34,19 @@ def api_error_handler(request, exc: ApiError):
         status=exc.status_code,
     )
 
+
+@async_api.exception_handler(ApiError)
+def async_api_error_handler(request, exc: ApiError):
+    return async_api.create_response(
+        request,
+        {
+            "detail": {
+                "title": exc.title,
+                "message": exc.message,
+            }},
+        status=exc.status_code,
+    )
+
 # @api.exception_handler(ValidationError)
 # def custom_validation_error_handler(request, exc):
 #     """
@@ -85,6 +109,9 @@ for app_path in LOCAL_APPS:
         # Look for the 'controllers' list we defined in step 2
         if hasattr(module, 'register_controllers'):
             api.register_controllers(*module.register_controllers)
+        if hasattr(module, 'register_async_controllers'):
+            async_api.register_controllers(
+                *module.register_async_controllers)
 
     except ImportError as e:
         raise ImportError(
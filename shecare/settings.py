@@ -19,6 +19,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
 
     'accounts',
     'general',
@@ -78,6 +79,26 @@ else:
             'NAME': BASE_DIR / 'db.sqlite3',
         }
     }
+    # SQLite builds period_customer_start_idx without its INCLUDE
+    # columns, the index is only covering on PostgreSQL. The key columns
+    # still serve the lookups, so the warning is expected here.
+    SILENCED_SYSTEM_CHECKS = ['models.W040']
+
+if config('CACHE_BACKEND', default='locmem') == 'file':
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': config(
+                'CACHE_LOCATION', default=str(BASE_DIR / '.cache')),
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'shecare',
+        }
+    }
 
 
 AUTH_PASSWORD_VALIDATORS = [
@@ -16,12 +16,13 @@ Including another URLconf
 """
 from django.contrib import admin
 from django.urls import path
-from .api import api
+from .api import api, async_api
 from django.conf import settings
 from django.conf.urls.static import static
 
 urlpatterns = [
     path('admin/', admin.site.urls),
+    path('api/v1/async/', async_api.urls),
     path('api/v1/', api.urls),
     # media and static
 ] + (static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT) +